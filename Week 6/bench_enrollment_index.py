@@ -0,0 +1,70 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from migrate_db import index_enrollments, migrate
+
+# Enrollment lookup latency before and after migrate_db.py adds the indexes.
+# Usage: python bench_enrollment_index.py [rows]   (default 10,000,000 rows)
+
+DEFAULT_ROWS = 10_000_000
+LOOKUPS = 200
+STUDENTS = 200_000
+COURSES = 500
+
+SCHEMA = """
+CREATE TABLE enrollment (
+    enrollment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    course_id INTEGER NOT NULL
+);
+"""
+
+def build_database(path, rows):
+    rng = random.Random(42)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    pairs = set()
+    while len(pairs) < rows:
+        pairs.add((rng.randrange(STUDENTS), rng.randrange(COURSES)))
+    conn.executemany("INSERT INTO enrollment (student_id, course_id) VALUES (?, ?)", pairs)
+    conn.commit()
+    conn.close()
+
+# Milliseconds per query for the EnrollmentAPI.get and EnrollmentDeleteAPI lookups
+def time_lookups(path, lookups):
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    results = {}
+    for name, sql, params in [
+        ("by student", "SELECT * FROM enrollment WHERE student_id = ?", lambda: (rng.randrange(STUDENTS),)),
+        ("by student+course", "SELECT * FROM enrollment WHERE student_id = ? AND course_id = ? LIMIT 1",
+         lambda: (rng.randrange(STUDENTS), rng.randrange(COURSES))),
+        ("by course", "SELECT * FROM enrollment WHERE course_id = ?", lambda: (rng.randrange(COURSES),)),
+    ]:
+        start = time.perf_counter()
+        for _ in range(lookups):
+            conn.execute(sql, params()).fetchall()
+        results[name] = (time.perf_counter() - start) * 1000 / lookups
+    conn.close()
+    return results
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    rows = min(rows, STUDENTS * COURSES)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "enrollment.sqlite3")
+        print(f"Building {rows:,} enrollments...")
+        build_database(path, rows)
+        # Full scans are slow, so fewer lookups before the indexes exist
+        before = time_lookups(path, max(1, LOOKUPS // 20))
+        migrate(path, [index_enrollments])
+        after = time_lookups(path, LOOKUPS)
+        print(f"{'lookup':<20}{'before ms':>12}{'after ms':>12}")
+        for name in before:
+            print(f"{name:<20}{before[name]:>12.3f}{after[name]:>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import sys
+import time
+
+# Deletes rows whose parent row is gone (enrollments orphaned by deletes made
+# before the ON DELETE CASCADE foreign keys), then VACUUMs and ANALYZEs.
+# Usage: python compact_db.py [--every SECONDS] [database ...]
+#   --every keeps it running in the background, compacting on that interval
+
+DEFAULT_DATABASES = ["instance/api_database.sqlite3", "api_database.sqlite3"]
+BUSY_TIMEOUT = 30000  # ms to wait for the apps' writes to finish
+
+# One DELETE per foreign key of every table, each a lookup in the parent's key
+def purge_orphans(conn):
+    removed = 0
+    tables = [name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    for table in tables:
+        # foreign_key_list rows: id, seq, table, from, to, on_update, on_delete, match
+        for fk in conn.execute(f"PRAGMA foreign_key_list({table})").fetchall():
+            removed += conn.execute(
+                f"DELETE FROM {table} WHERE {fk[3]} NOT IN (SELECT {fk[4]} FROM {fk[2]})").rowcount
+    return removed
+
+def compact(path):
+    before = os.path.getsize(path)
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT}")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            removed = purge_orphans(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        # ANALYZE refreshes the planner's statistics for the indexes, VACUUM
+        # then rewrites the file without the free pages
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    after = os.path.getsize(path)
+    print(f"{path}: {removed} orphaned rows removed, {before / 1024:.0f} KiB -> {after / 1024:.0f} KiB")
+
+def main():
+    args = sys.argv[1:]
+    every = None
+    if args[:1] == ["--every"]:
+        every = float(args[1])
+        args = args[2:]
+    paths = args or [path for path in DEFAULT_DATABASES if os.path.exists(path)]
+    if not paths:
+        print("No database found")
+        return
+    while True:
+        for path in paths:
+            try:
+                compact(path)
+            except sqlite3.OperationalError as e:
+                if every is None:
+                    raise
+                print(f"{path}: compaction skipped, {e}")
+        if every is None:
+            return
+        time.sleep(every)
+
+if __name__ == "__main__":
+    main()
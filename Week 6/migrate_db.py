@@ -0,0 +1,120 @@
+import os
+import re
+import sqlite3
+import sys
+
+# Brings databases created from older versions of the models up to date.
+# Usage: python migrate_db.py [database ...]
+
+DEFAULT_DATABASES = ["instance/api_database.sqlite3", "api_database.sqlite3"]
+
+# The search index and table version SQL lives with the week 6 app (the same
+# folder on a case-insensitive file system)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "week 6"))
+from db_schema import SEARCH_BACKFILL, SEARCH_SCHEMA, TABLE_VERSION_SCHEMA
+
+# Enrollment indexes: drop duplicate (student, course) rows, keeping the oldest,
+# so the unique index can be built
+DEDUPE_ENROLLMENTS = """
+DELETE FROM enrollment WHERE rowid NOT IN (
+    SELECT MIN(rowid) FROM enrollment GROUP BY student_id, course_id
+)
+"""
+ENROLLMENT_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_enrollment_student_course ON enrollment (student_id, course_id)",
+    "CREATE INDEX IF NOT EXISTS ix_enrollment_course_student ON enrollment (course_id, student_id)",
+]
+
+# Per-course enrollment counter used by /api/course/stats, rebuilt from the
+# enrollments of students that still exist
+ENROLLMENT_COUNTS = [
+    """CREATE TABLE IF NOT EXISTS course_enrollment_count (
+        course_id INTEGER NOT NULL PRIMARY KEY REFERENCES course (course_id) ON DELETE CASCADE,
+        student_count INTEGER NOT NULL
+    )""",
+    "DELETE FROM course_enrollment_count",
+    """INSERT INTO course_enrollment_count (course_id, student_count)
+    SELECT enrollment.course_id, COUNT(*) FROM enrollment
+    JOIN student ON student.student_id = enrollment.student_id
+    JOIN course ON course.course_id = enrollment.course_id
+    GROUP BY enrollment.course_id""",
+]
+
+# ON DELETE CASCADE foreign keys. SQLite can't alter a foreign key, so a table
+# whose foreign keys don't cascade yet is rebuilt from its own CREATE TABLE
+# with them added. Only rows whose parents still exist are copied over, so
+# this also drops the orphans left by deletes before the cascade existed.
+CASCADE_TABLES = ["enrollment", "course_enrollment_count"]
+REFERENCES = re.compile(r'(REFERENCES\s+"?\w+"?\s*\([^)]*\))(?!\s*ON DELETE)', re.IGNORECASE)
+
+def add_delete_cascade(conn, table):
+    # foreign_key_list rows: id, seq, table, from, to, on_update, on_delete, match
+    foreign_keys = conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+    if all(fk[6] == "CASCADE" for fk in foreign_keys):
+        return 0
+    (create,) = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    indexes = [sql for (sql,) in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))]
+    (rows,) = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+
+    conn.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    conn.execute(REFERENCES.sub(r"\1 ON DELETE CASCADE", create))
+    parents = " AND ".join(f"{fk[3]} IN (SELECT {fk[4]} FROM {fk[2]})" for fk in foreign_keys)
+    copied = conn.execute(f"INSERT INTO {table} SELECT * FROM {table}_old WHERE {parents}").rowcount
+    conn.execute(f"DROP TABLE {table}_old")
+    for sql in indexes:
+        conn.execute(sql)
+    return rows - copied
+
+# Each step runs in migrate()'s transaction and returns the rows it removed
+def index_enrollments(conn):
+    removed = conn.execute(DEDUPE_ENROLLMENTS).rowcount
+    for statement in ENROLLMENT_INDEXES:
+        conn.execute(statement)
+    return removed
+
+def cascade_and_count(conn):
+    conn.execute(ENROLLMENT_COUNTS[0])
+    orphans = sum(add_delete_cascade(conn, table) for table in CASCADE_TABLES)
+    for statement in ENROLLMENT_COUNTS[1:]:
+        conn.execute(statement)
+    return orphans
+
+# The search index, filled from the existing rows when first created
+def add_search_index(conn):
+    new_search_index = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_index'").fetchone()
+    for statement in SEARCH_SCHEMA + (SEARCH_BACKFILL if new_search_index else []):
+        conn.execute(statement)
+    return 0
+
+# The write counters behind the API's response cache
+def add_table_versions(conn):
+    for statement in TABLE_VERSION_SCHEMA:
+        conn.execute(statement)
+    return 0
+
+STEPS = [index_enrollments, cascade_and_count, add_search_index, add_table_versions]
+
+def migrate(path, steps=STEPS):
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        removed = sum(step(conn) for step in steps)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    print(f"{path}: {', '.join(step.__name__ for step in steps)} done, {removed} duplicate or orphaned rows removed")
+
+def main():
+    paths = sys.argv[1:] or [path for path in DEFAULT_DATABASES if os.path.exists(path)]
+    if not paths:
+        print("No database found")
+        return
+    for path in paths:
+        migrate(path)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,13 @@
+import os
+import sys
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
+
+# The search index and table version SQL lives with the week 6 app (the same
+# folder on a case-insensitive file system)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "week 6"))
+from db_schema import SEARCH_SCHEMA, TABLE_VERSION_SCHEMA
 
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///api_database.sqlite3'
@@ -23,9 +31,23 @@ class Student(db.Model):
 
 class Enrollment(db.Model):
     __tablename__ = 'enrollment'
+    # One row per (student, course); the unique index also serves student_id
+    # lookups, the second one course_id lookups
+    __table_args__ = (
+        db.Index('uq_enrollment_student_course', 'student_id', 'course_id', unique=True),
+        db.Index('ix_enrollment_course_student', 'course_id', 'student_id'),
+    )
     enrollment_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student.student_id'), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey('course.course_id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.student_id', ondelete='CASCADE'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.course_id', ondelete='CASCADE'), nullable=False)
+
+class CourseEnrollmentCount(db.Model):
+    __tablename__ = 'course_enrollment_count'
+    course_id = db.Column(db.Integer, db.ForeignKey('course.course_id', ondelete='CASCADE'), primary_key=True)
+    student_count = db.Column(db.Integer, nullable=False, default=0)
+
+for statement in SEARCH_SCHEMA + TABLE_VERSION_SCHEMA:
+    event.listen(db.metadata, "after_create", DDL(statement))
 
 # Create the database and tables
 with app.app_context():
@@ -45,6 +67,8 @@ with app.app_context():
     enrollment1 = Enrollment(student_id=1, course_id=1)  # John Doe enrolled in Mathematics
     enrollment2 = Enrollment(student_id=2, course_id=2)  # Jane Smith enrolled in Physics
     db.session.add_all([enrollment1, enrollment2])
+    db.session.add_all([CourseEnrollmentCount(course_id=1, student_count=1),
+                        CourseEnrollmentCount(course_id=2, student_count=1)])
 
     # Commit changes
     db.session.commit()
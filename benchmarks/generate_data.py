@@ -0,0 +1,137 @@
+import argparse
+import importlib
+import os
+import sqlite3
+import sys
+import numpy as np
+
+# Synthetic marks/enrollment data at any scale, the same for a given seed.
+# Students take 1 + Poisson(AVERAGE_COURSES - 1) courses each, picked by a
+# Zipf-like popularity so a few courses are much larger than the rest, and
+# each (student, course) pair appears once. Marks are normal around a
+# per-course difficulty and clipped to 0-100.
+# Usage:
+#   python generate_data.py csv OUT.csv --rows N [--courses C] [--seed S]
+#   python generate_data.py db week5|week6 OUT.sqlite3 --rows N [--courses C] [--seed S]
+# The databases are created through the week's own models (db.create_all()),
+# so they match what the apps expect.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_COURSES = 200
+AVERAGE_COURSES = 5
+POPULARITY_SKEW = 1.1
+FIRST_STUDENT_ID = 1000
+FIRST_COURSE_ID = 2000
+CHUNK_STUDENTS = 200_000
+
+# Enrollment chunks as (student_ids, course_indexes) arrays, `rows` in total
+def iter_enrollments(rows, courses, seed):
+    rng = np.random.default_rng(seed)
+    popularity = 1 / np.arange(1, courses + 1) ** POPULARITY_SKEW
+    popularity = rng.permutation(popularity / popularity.sum())
+    next_student = 0
+    remaining = rows
+    while remaining > 0:
+        students = min(CHUNK_STUDENTS, remaining // AVERAGE_COURSES + 1)
+        taken = np.minimum(1 + rng.poisson(AVERAGE_COURSES - 1, students), courses)
+        student_index = np.repeat(np.arange(next_student, next_student + students), taken)
+        course_index = rng.choice(courses, len(student_index), p=popularity)
+        # Drop repeated picks of a course by the same student; np.unique also
+        # sorts, leaving each student's courses together
+        pairs = np.unique(student_index.astype(np.int64) * courses + course_index)[:remaining]
+        next_student += students
+        remaining -= len(pairs)
+        yield pairs // courses, pairs % courses
+
+def course_difficulty(courses, seed):
+    return np.random.default_rng(seed + 1).normal(65, 10, courses)
+
+def iter_rows(rows, courses, seed):
+    difficulty = course_difficulty(courses, seed)
+    rng = np.random.default_rng(seed + 2)
+    for student_index, course_index in iter_enrollments(rows, courses, seed):
+        marks = np.clip(np.rint(rng.normal(difficulty[course_index], 15)), 0, 100).astype(np.int64)
+        yield student_index + FIRST_STUDENT_ID, course_index + FIRST_COURSE_ID, marks
+
+# data.csv for weeks 3 and 4
+def generate_csv(path, rows, courses=DEFAULT_COURSES, seed=42):
+    with open(path, "w") as f:
+        f.write("Student id, Course id, Marks\n")
+        for student_ids, course_ids, marks in iter_rows(rows, courses, seed):
+            f.write("".join(f"{s}, {c}, {m}\n" for s, c, m in zip(student_ids.tolist(), course_ids.tolist(),
+                                                                  marks.tolist())))
+
+# The week's app module, pointed at `path`
+def load_app(week, path):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(path)}"
+    sys.path.insert(0, os.path.join(ROOT, {"week5": "week 5", "week6": "week 6"}[week]))
+    return importlib.import_module("app")
+
+def column_names(model):
+    return [column.name for column in model.__table__.columns]
+
+# Students, courses and enrollments for the week 5 or week 6 app. Row
+# positions double as primary keys (starting at 1).
+def generate_db(week, path, rows, courses=DEFAULT_COURSES, seed=42):
+    if os.path.exists(path):
+        os.remove(path)
+    app = load_app(week, path)
+    with app.app.app_context():
+        app.db.create_all()
+        app.db.engine.dispose()
+
+    student_columns = column_names(app.Student)
+    course_columns = column_names(app.Course)
+    enrollment_columns = column_names(app.Enrollment)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    difficulty = course_difficulty(courses, seed)
+    course_rows = []
+    for i in range(courses):
+        values = {"course_code": f"C{FIRST_COURSE_ID + i}", "course_name": f"Course {FIRST_COURSE_ID + i}",
+                  "course_description": f"Average mark around {difficulty[i]:.0f}"}
+        course_rows.append([i + 1 if name in ("id", "course_id") else values[name] for name in course_columns])
+    conn.executemany(f"INSERT INTO course ({', '.join(course_columns)}) VALUES ({', '.join('?' * len(course_columns))})",
+                     course_rows)
+
+    enrollment_id = 0
+    counts = np.zeros(courses, dtype=np.int64)
+    for student_index, course_index in iter_enrollments(rows, courses, seed):
+        students = np.unique(student_index)
+        conn.executemany(
+            f"INSERT INTO student ({', '.join(student_columns)}) VALUES ({', '.join('?' * len(student_columns))})",
+            ([int(s) + 1 if name in ("id", "student_id") else {
+                "roll_number": f"R{FIRST_STUDENT_ID + int(s):08d}",
+                "first_name": f"First{s}",
+                "last_name": f"Last{s}",
+            }[name] for name in student_columns] for s in students.tolist()))
+        ids = range(enrollment_id + 1, enrollment_id + len(student_index) + 1)
+        conn.executemany(
+            f"INSERT INTO enrollment ({', '.join(enrollment_columns)}) VALUES (?, ?, ?)",
+            zip(ids, (student_index + 1).tolist(), (course_index + 1).tolist()))
+        enrollment_id += len(student_index)
+        counts += np.bincount(course_index, minlength=courses)
+    if hasattr(app, "CourseEnrollmentCount"):
+        conn.executemany("INSERT INTO course_enrollment_count (course_id, student_count) VALUES (?, ?)",
+                         [(i + 1, int(count)) for i, count in enumerate(counts) if count])
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic marks data")
+    parser.add_argument("kind", choices=["csv", "db"])
+    parser.add_argument("target", nargs="+", help="OUT.csv, or week5|week6 OUT.sqlite3")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=DEFAULT_COURSES)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.kind == "csv":
+        generate_csv(args.target[0], args.rows, args.courses, args.seed)
+    else:
+        week, path = args.target
+        generate_db(week, path, args.rows, args.courses, args.seed)
+
+if __name__ == "__main__":
+    main()
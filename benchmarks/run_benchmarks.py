@@ -0,0 +1,234 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from generate_data import DEFAULT_COURSES, ROOT, generate_csv
+
+# Benchmarks the week 3 CLI reports, the week 4 lookup page and the week 6
+# API on generated data, one subprocess per benchmark. The Flask apps run
+# in-process through the test client, so only the app's own work is timed.
+# Reports throughput, p50/p99 latency and peak RSS per operation, and saves
+# the run to results/ (named by time and git commit) for later comparison.
+# Usage: python run_benchmarks.py [--rows N] [--requests N] [--only a,b]
+#                                 [--compare results/OLD.json] [--no-save]
+# Generated data is kept in data/<rows>/ and reused.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEED = 1
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+def peak_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def data_dir(rows):
+    path = os.path.join(HERE, "data", str(rows))
+    os.makedirs(path, exist_ok=True)
+    if not os.path.exists(os.path.join(path, "data.csv")):
+        print(f"Generating {rows:,} rows of data.csv...")
+        generate_csv(os.path.join(path, "data.csv"), rows)
+    if not os.path.exists(os.path.join(path, "week6.sqlite3")):
+        print(f"Generating a week 6 database with {rows:,} enrollments...")
+        subprocess.run([sys.executable, os.path.join(HERE, "generate_data.py"), "db", "week6",
+                        os.path.join(path, "week6.sqlite3"), "--rows", str(rows)], check=True)
+    return path
+
+# The IDs that exist in the generated data
+def sample_ids(data, column):
+    with open(os.path.join(data, "data.csv")) as f:
+        next(f)
+        return sorted({int(line.split(",")[column]) for _, line in zip(range(100_000), f)})
+
+# Benchmarks. Each runs `requests` operations and returns {operation: [seconds, ...]},
+# plus an optional peak RSS in MiB when it isn't this process's own.
+
+def cli_reports(data, requests):
+    rng = random.Random(SEED)
+    students, courses = sample_ids(data, 0), sample_ids(data, 1)
+    latencies = {"student report": [], "course report": []}
+    peak = 0
+    with tempfile.TemporaryDirectory() as work:
+        for name in ("app.py", "marks_store.py", "analytics.py"):
+            shutil.copy(os.path.join(ROOT, "week 3", name), work)
+        shutil.copy(os.path.join(data, "data.csv"), work)
+        runs = [("student report", "-s", students), ("course report", "-c", courses)]
+        for i in range(requests + 1):
+            operation, option, ids = runs[i % 2]
+            start = time.perf_counter()
+            process = subprocess.Popen([sys.executable, "app.py", option, str(rng.choice(ids))], cwd=work,
+                                       stdout=subprocess.DEVNULL)
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            if i:  # the first run also builds data.csv.cache
+                latencies[operation].append(time.perf_counter() - start)
+                peak = max(peak, usage.ru_maxrss / 1024)
+    return latencies, peak
+
+def week4_lookup(data, requests):
+    rng = random.Random(SEED)
+    students, courses = sample_ids(data, 0), sample_ids(data, 1)
+    with tempfile.TemporaryDirectory() as work:
+        shutil.copy(os.path.join(data, "data.csv"), work)
+        os.chdir(work)
+        sys.path.insert(0, os.path.join(ROOT, "week 4"))
+        from app import app
+        client = app.test_client()
+        client.post("/", data={"ID": "course_id", "id_value": courses[0]})  # loads data.csv
+        # Loading queues every course's histogram; wait for them (503 until then)
+        for course_id in courses:
+            while client.get(f"/course/{course_id}/histogram.png").status_code == 503:
+                time.sleep(0.01)
+
+        operations = {
+            "student lookup": lambda: client.post("/", data={"ID": "student_id", "id_value": rng.choice(students)}),
+            "course lookup": lambda: client.post("/", data={"ID": "course_id", "id_value": rng.choice(courses)}),
+            "histogram": lambda: client.get(f"/course/{rng.choice(courses)}/histogram.png"),
+        }
+        latencies = run_operations(operations, requests, rng)
+        os.chdir(HERE)  # out of the directory before it is removed
+    return latencies, None
+
+def week6_api(data, requests):
+    rng = random.Random(SEED)
+    with tempfile.TemporaryDirectory() as work:
+        database = os.path.join(work, "api.sqlite3")
+        shutil.copy(os.path.join(data, "week6.sqlite3"), database)
+        os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+        sys.path.insert(0, os.path.join(ROOT, "week 6"))
+        from app import app, db, Student
+        with app.app_context():
+            students = db.session.execute(db.select(db.func.max(Student.student_id))).scalar()
+        client = app.test_client()
+        created = []
+
+        def create_student():
+            response = client.post("/api/student", json={"roll_number": f"B{len(created)}-{rng.random()}",
+                                                          "first_name": "Bench"})
+            created.append(response.get_json()["student_id"])
+
+        # Deletes the newest student this run created (with the enrollments the
+        # database cascades), so the generated rows are left alone
+        def delete_student():
+            if not created:
+                create_student()
+            client.delete(f"/api/student/{created.pop()}")
+
+        operations = {
+            "get student": lambda: client.get(f"/api/student/{rng.randint(1, students)}"),
+            "list students": lambda: client.get(f"/api/student?limit=100&after={rng.randint(0, students)}"),
+            "create student": create_student,
+            "update student": lambda: client.put(f"/api/student/{rng.randint(1, students)}",
+                                                 json={"last_name": f"L{rng.random()}"}),
+            "enroll": lambda: client.post(f"/api/student/{rng.choice(created or [1])}/course",
+                                          json={"course_id": rng.randint(1, DEFAULT_COURSES)}),
+            "delete student": delete_student,
+            "course roster": lambda: client.get(f"/api/course/{rng.randint(1, DEFAULT_COURSES)}/students?limit=100"),
+            "course stats": lambda: client.get("/api/course/stats"),
+        }
+        latencies = run_operations(operations, requests, rng)
+        with app.app_context():
+            db.engine.dispose()  # closes the database file before it is removed
+    return latencies, None
+
+# `requests` operations picked round-robin so every run does the same mix
+def run_operations(operations, requests, rng):
+    latencies = {name: [] for name in operations}
+    names = list(operations)
+    for i in range(requests):
+        name = names[i % len(names)]
+        start = time.perf_counter()
+        operations[name]()
+        latencies[name].append(time.perf_counter() - start)
+    return latencies
+
+BENCHMARKS = {"cli_reports": cli_reports, "week4_lookup": week4_lookup, "week6_api": week6_api}
+
+def summarize(latencies, elapsed, peak):
+    operations = {}
+    for name, values in latencies.items():
+        if values:
+            operations[name] = {
+                "count": len(values),
+                "per_second": len(values) / sum(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+            }
+    total = sum(len(values) for values in latencies.values())
+    return {"per_second": total / elapsed, "peak_rss_mib": peak, "operations": operations}
+
+# Child process: one benchmark, result as JSON on the last line of stdout
+def run_one(name, data, requests):
+    start = time.perf_counter()
+    latencies, peak = BENCHMARKS[name](data, requests)
+    result = summarize(latencies, time.perf_counter() - start, peak or peak_rss_mib())
+    print(json.dumps(result))
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_results(results, baseline=None):
+    print(f"{'benchmark':<14}{'operation':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'RSS MiB':>10}"
+          + (f"{'p50 vs base':>13}" if baseline else ""))
+    for name, result in results.items():
+        for operation, stats in result["operations"].items():
+            line = (f"{name:<14}{operation:<16}{stats['per_second']:>10.1f}{stats['p50_ms']:>10.2f}"
+                    f"{stats['p99_ms']:>10.2f}{result['peak_rss_mib']:>10.1f}")
+            base = (baseline or {}).get(name, {}).get("operations", {}).get(operation)
+            if base:
+                line += f"{(stats['p50_ms'] / base['p50_ms'] - 1) * 100:>+12.1f}%"
+            print(line)
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--run":
+        run_one(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--only", help="comma-separated benchmark names: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--compare", help="an earlier results file to compare p50 latency against")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    data = data_dir(args.rows)
+    results = {}
+    for name in names:
+        print(f"Running {name}...")
+        out = subprocess.run([sys.executable, __file__, "--run", name, data, str(args.requests)],
+                             capture_output=True, text=True, check=True).stdout
+        results[name] = json.loads(out.strip().splitlines()[-1])
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print(f"{args.rows:,} rows, {args.requests} requests per benchmark")
+    print_results(results, baseline)
+
+    if not args.no_save:
+        commit = git_commit()
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        os.makedirs(os.path.join(HERE, "results"), exist_ok=True)
+        path = os.path.join(HERE, "results", f"{stamp}-{commit}.json")
+        with open(path, "w") as f:
+            json.dump({"commit": commit, "time": stamp, "rows": args.rows, "requests": args.requests,
+                       "python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"Saved {os.path.relpath(path)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,34 @@
+import os
 import sys
-import csv
-import matplotlib.pyplot as plt
-from pyhtml import html, body, h1, table, tr, td, th
+from functools import partial
+from marks_store import DataError, MarksStore, bin_edges, parse_id, stream_report
+
+# matplotlib, pyhtml, numpy (through analytics) and the process pool are
+# imported where they are first used: matplotlib alone is most of a run's
+# time, and a student report never draws a chart. Checked by bench_startup.py.
+
+# pyplot on the non-interactive Agg backend (charts are only saved to files)
+def pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
 
 def read_csv():
-    data = []
     try:
-        with open("data.csv", mode='r') as file:
-            csv_reader = csv.reader(file)
-            next(csv_reader)
-            for row in csv_reader:
-                data.append({
-                    "student_id": row[0],
-                    "course_id": row[1],
-                    "marks": int(row[2])
-                })
+        return MarksStore.load("data.csv")
     except FileNotFoundError:
         print("CSV file not found!")
         sys.exit(1)
-    return data
+    except DataError as error:
+        print(error)
+        sys.exit(1)
 
+# student_data is a list of (student_id, course_id, marks) rows
 def generate_student_html(student_data):
-    rows = [tr(td(student["student_id"]), td(student["course_id"]), td(student["marks"])) for student in student_data]
-    total_marks = sum([student["marks"] for student in student_data])
+    from pyhtml import html, body, h1, table, tr, td
+    rows = [tr(td(student_id), td(course_id), td(marks)) for student_id, course_id, marks in student_data]
+    total_marks = sum(marks for _, _, marks in student_data)
     rows.append(tr(td("Total Marks"), td(""), td(str(total_marks))))
 
     return html(
@@ -33,6 +39,7 @@ def generate_student_html(student_data):
     )
 
 def generate_course_html(course_data, avg_marks, max_marks):
+    from pyhtml import html, body, h1, table, tr, td, th
     return html(
         body(
             h1("Course Details"),
@@ -43,27 +50,150 @@ def generate_course_html(course_data, avg_marks, max_marks):
         )
     )
 
-def generate_histogram(course_data):
-    marks = [student["marks"] for student in course_data]
-    plt.hist(marks, bins=10, color='skyblue', edgecolor='black')
+def generate_histogram(marks, path="histogram.png", bins=10, weights=None):
+    plt = pyplot()
+    plt.figure()
+    plt.hist(marks, bins=bins, weights=weights, color='skyblue', edgecolor='black')
     plt.title("Marks Distribution")
     plt.xlabel("Marks")
     plt.ylabel("Frequency")
-    plt.savefig("histogram.png")
+    plt.savefig(path)
+    plt.close()
+
+# Batch mode: option -> (report kind, whether the IDs come from a file)
+BATCH_OPTIONS = {
+    "--all-students": ("student", False),
+    "--all-courses": ("course", False),
+    "--student-ids": ("student", True),
+    "--course-ids": ("course", True),
+}
+
+def read_ids(path):
+    with open(path) as file:
+        return [line.strip() for line in file if line.strip()]
+
+# Worker processes each load the store themselves (MarksStore.load maps the
+# sidecar cache the parent just wrote, without copying it) and are sent only
+# chunks of IDs, so no report's rows are ever pickled across
+worker_store = None
+
+def init_worker(path):
+    global worker_store
+    worker_store = MarksStore.load(path)
+
+def write_student_report(out_dir, student_id, student_data):
+    with open(os.path.join(out_dir, f"student_{student_id}.html"), "w") as f:
+        f.write(str(generate_student_html(student_data)))
+
+def write_course_report(out_dir, course_id, summary, marks):
+    avg_marks, max_marks = summary["mean"], summary["max"]
+    with open(os.path.join(out_dir, f"course_{course_id}.html"), "w") as f:
+        f.write(str(generate_course_html(marks, avg_marks, max_marks)))
+    generate_histogram(marks, os.path.join(out_dir, f"course_{course_id}.png"))
+
+def write_student_reports(out_dir, student_ids):
+    for student_id in student_ids:
+        write_student_report(out_dir, student_id, worker_store.student_rows(student_id))
+
+def write_course_reports(out_dir, course_ids):
+    from analytics import course_statistics
+    stats = course_statistics(worker_store, course_ids)
+    for course_id in course_ids:
+        write_course_report(out_dir, course_id, stats.summary(course_id), worker_store.course_marks(course_id))
+
+def run_batch(store, kind, ids, out_dir, workers=None, path="data.csv"):
+    index = store.by_student if kind == "student" else store.by_course
+    valid = []
+    for value in ids:
+        key = parse_id(value)
+        if key in index:
+            valid.append(key)
+        else:
+            print(f"Invalid {kind} ID: {value}")
+    if not valid:
+        return 0
+
+    os.makedirs(out_dir, exist_ok=True)
+    write_reports = write_student_reports if kind == "student" else write_course_reports
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    size = max(1, len(valid) // (workers * 4))
+    chunks = [valid[i:i + size] for i in range(0, len(valid), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(path,)) as executor:
+        for _ in executor.map(partial(write_reports, out_dir), chunks):
+            pass
+    return len(valid)
+
+def batch_main(args):
+    kind, from_file = BATCH_OPTIONS[args[0]]
+    if len(args) != (3 if from_file else 2):
+        print("Invalid arguments")
+        return
+
+    store = read_csv()
+    if from_file:
+        ids = read_ids(args[1])
+    else:
+        ids = store.students() if kind == "student" else store.courses()
+    out_dir = args[-1]
+
+    written = run_batch(store, kind, ids, out_dir)
+    print(f"Wrote {written} {kind} reports to {out_dir}")
+
+# Single report over a streamed CSV: bounded memory, histogram from fixed bins
+def stream_main(param_type, param_value):
+    key = parse_id(param_value)
+    try:
+        student_data, courses = stream_report("data.csv", key if param_type == "-s" else None)
+    except FileNotFoundError:
+        print("CSV file not found!")
+        sys.exit(1)
+    except DataError as error:
+        print(error)
+        sys.exit(1)
+
+    if param_type == "-s":
+        if not student_data:
+            print("Invalid student ID")
+            return
+        with open("output.html", "w") as f:
+            f.write(str(generate_student_html(student_data)))
+
+    elif param_type == "-c":
+        print("Available course IDs:", set(courses))
+        aggregate = courses.get(key)
+        if aggregate is None:
+            print("Invalid course ID")
+            return
+        with open("output.html", "w") as f:
+            f.write(str(generate_course_html(None, aggregate.average, aggregate.maximum)))
+        edges = bin_edges()
+        generate_histogram(edges[:-1], bins=edges, weights=aggregate.bins)
+
+    else:
+        print("Invalid parameter")
 
 def main():
-    if len(sys.argv) != 3:
+    if len(sys.argv) > 1 and sys.argv[1] in BATCH_OPTIONS:
+        batch_main(sys.argv[1:])
+        return
+
+    if len(sys.argv) not in (3, 4) or sys.argv[3:] not in ([], ["--stream"]):
         print("Invalid arguments")
         return
     
     param_type = sys.argv[1]
     param_value = sys.argv[2]
 
-    data = read_csv()
+    if len(sys.argv) == 4:
+        stream_main(param_type, param_value)
+        return
+
+    store = read_csv()
 
     if param_type == "-s":
-        student_id = param_value
-        student_data = [d for d in data if d["student_id"] == student_id]
+        student_id = parse_id(param_value)
+        student_data = store.student_rows(student_id)
         if not student_data:
             print("Invalid student ID")
             return
@@ -72,16 +202,17 @@ def main():
             f.write(str(html_output))
     
     elif param_type == "-c":
-        course_id = param_value
-        print("Available course IDs:", set(d["course_id"] for d in data))
+        from analytics import course_statistics
+        course_id = parse_id(param_value)
+        print("Available course IDs:", set(store.courses()))
         
-        course_data = [d for d in data if d["course_id"] == course_id]
-        if not course_data:
+        summary = course_statistics(store, [course_id]).summary(course_id)
+        if summary is None:
             print("Invalid course ID")
             return
         
-        avg_marks = sum([d["marks"] for d in course_data]) / len(course_data)
-        max_marks = max([d["marks"] for d in course_data])
+        avg_marks, max_marks = summary["mean"], summary["max"]
+        course_data = store.course_marks(course_id)
         html_output = generate_course_html(course_data, avg_marks, max_marks)
         
         with open("output.html", "w") as f:
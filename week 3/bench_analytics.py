@@ -0,0 +1,74 @@
+import statistics
+import sys
+import time
+from array import array
+import numpy as np
+from marks_store import GroupIndex, MarksStore
+from analytics import DEFAULT_PERCENTILES, course_statistics
+
+# Per-course statistics: plain Python loops vs the vectorized analytics module.
+# Usage: python bench_analytics.py [rows ...]   (default 1,000,000 and 50,000,000)
+
+DEFAULT_ROWS = [1_000_000, 50_000_000]
+
+# Same array('i') columns the store normally holds
+def to_array(values):
+    column = array('i')
+    column.frombytes(values.astype(np.int32).tobytes())
+    return column
+
+# Index built with numpy so setting up 50M rows doesn't dominate the run
+def numpy_index(column):
+    rows = np.argsort(column, kind='stable')
+    keys, counts = np.unique(column, return_counts=True)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return GroupIndex(to_array(keys), to_array(offsets), to_array(rows))
+
+def synthetic_store(rows, students=40_000, courses=50):
+    rng = np.random.default_rng(42)
+    student_ids = rng.integers(1000, 1000 + students, rows, dtype=np.int32)
+    course_ids = rng.integers(2000, 2000 + courses, rows, dtype=np.int32)
+    marks = rng.integers(0, 101, rows, dtype=np.int32)
+    return MarksStore(to_array(student_ids), to_array(course_ids), to_array(marks),
+                      numpy_index(student_ids), numpy_index(course_ids))
+
+# The same numbers the way the apps used to get them: sum/max/len over lists
+def loop_statistics(store):
+    result = {}
+    for course_id in store.courses():
+        marks = store.course_marks(course_id)
+        ordered = sorted(marks)
+        result[course_id] = {
+            "count": len(marks),
+            "mean": sum(marks) / len(marks),
+            "min": min(marks),
+            "max": max(marks),
+            "std": statistics.pstdev(marks),
+            "percentiles": {q: percentile(ordered, q) for q in DEFAULT_PERCENTILES},
+        }
+    return result
+
+def percentile(ordered, q):
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS
+    print(f"{'rows':>12}{'loops s':>12}{'numpy s':>12}{'speedup':>10}")
+    for rows in sizes:
+        store = synthetic_store(rows)
+        loop_seconds, expected = timed(loop_statistics, store)
+        numpy_seconds, stats = timed(course_statistics, store)
+        for course_id, summary in expected.items():
+            assert abs(stats.summary(course_id)["mean"] - summary["mean"]) < 1e-6
+        print(f"{rows:>12,}{loop_seconds:>12.2f}{numpy_seconds:>12.3f}{loop_seconds / numpy_seconds:>9.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import csv
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from marks_store import MarksStore, stream_report
+
+# Peak memory and time of the ways data.csv can be read, on a synthetic file.
+# Usage: python bench_memory.py [rows]   (default 10,000,000 rows)
+
+DEFAULT_ROWS = 10_000_000
+MODES = ["list_of_dicts", "marks_store", "stream", "cached_store"]
+
+def generate_csv(path, rows, students=40_000, courses=50):
+    rng = random.Random(42)
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Student id", " Course id", " Marks"])
+        for _ in range(rows):
+            writer.writerow([1000 + rng.randrange(students), f" {2000 + rng.randrange(courses)}", f" {rng.randint(0, 100)}"])
+
+# The original week 3 read_csv: every row becomes a dict
+def read_list_of_dicts(path):
+    data = []
+    with open(path, mode='r') as file:
+        csv_reader = csv.reader(file)
+        next(csv_reader)
+        for row in csv_reader:
+            data.append({
+                "student_id": row[0],
+                "course_id": row[1],
+                "marks": int(row[2])
+            })
+    return data
+
+def measure(mode, path):
+    start = time.perf_counter()
+    if mode == "list_of_dicts":
+        data = read_list_of_dicts(path)
+        course_data = [d for d in data if d["course_id"] == " 2001"]
+        max(d["marks"] for d in course_data)
+    elif mode == "marks_store":
+        MarksStore.from_csv(path).course_stats(2001)
+    elif mode == "cached_store":
+        MarksStore.load(path).course_stats(2001)
+    else:
+        stream_report(path, 1001)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode},{elapsed:.2f},{peak_mb:.1f}")
+
+# Each mode runs in a fresh interpreter so peak RSS isn't shared
+def run_measure(mode, path):
+    out = subprocess.run([sys.executable, __file__, "--measure", mode, path],
+                         capture_output=True, text=True, check=True).stdout
+    return out.strip().split(",")
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3])
+        return
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.csv")
+        print(f"Generating {rows:,} rows...")
+        generate_csv(path, rows)
+        run_measure("cached_store", path)  # writes the binary cache
+        print(f"{'mode':<15}{'seconds':>10}{'peak MB':>12}")
+        for mode in MODES:
+            name, seconds, peak = run_measure(mode, path)
+            print(f"{name:<15}{seconds:>10}{peak:>12}")
+
+if __name__ == "__main__":
+    main()
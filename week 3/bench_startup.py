@@ -0,0 +1,84 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Start-up time of the three report CLIs for a student report (-s), which is
+# what the cron jobs run thousands of times. Each tool runs in a copy of this
+# folder; the median wall time of --runs runs is checked against the
+# threshold, and one `python -X importtime` run lists the slowest top-level
+# imports and fails the check if a student report imported matplotlib or
+# jinja2.
+# Exits with status 1 when a check fails, so it can guard against regressions.
+# Usage: python bench_startup.py [--runs N] [--threshold MS]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RUNS = 20
+DEFAULT_THRESHOLD_MS = 100
+TOOLS = ["app.py", "test/app.py", "week2/app.py"]
+FORBIDDEN = ("matplotlib", "jinja2")
+TOP_IMPORTS = 5
+
+
+def first_student(work, tool):
+    with open(os.path.join(work, os.path.dirname(tool), "data.csv")) as f:
+        next(f)
+        return next(f).split(",")[0].strip()
+
+
+def run_tool(work, tool, student_id, *python_options):
+    return subprocess.run([sys.executable, *python_options, os.path.basename(tool), "-s", student_id],
+                          cwd=os.path.join(work, os.path.dirname(tool)), capture_output=True, text=True,
+                          check=True)
+
+
+# "import time: self [us] | cumulative | imported package" lines, top-level
+# imports only (nested ones are indented under their parent)
+def parse_importtime(stderr):
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((name.strip(), int(cumulative) / 1000, not name.startswith("  ")))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the report CLIs' start-up time")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_MS, help="ms for a student report")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as work:
+        shutil.copytree(HERE, work, dirs_exist_ok=True, ignore=shutil.ignore_patterns("__pycache__", "*.zip"))
+        for tool in TOOLS:
+            student_id = first_student(work, tool)
+            run_tool(work, tool, student_id)  # writes the .pyc files and caches
+            times = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                run_tool(work, tool, student_id)
+                times.append((time.perf_counter() - start) * 1000)
+            median = sorted(times)[len(times) // 2]
+
+            imports = parse_importtime(run_tool(work, tool, student_id, "-X", "importtime").stderr)
+            forbidden = sorted({name.split(".")[0] for name, _, _ in imports if name.startswith(FORBIDDEN)})
+            ok = median <= args.threshold and not forbidden
+            failed = failed or not ok
+            print(f"{tool:<14} -s {student_id}: median {median:.1f} ms (threshold {args.threshold:.0f} ms)"
+                  f"{'' if ok else '  FAILED'}")
+            if forbidden:
+                print(f"  imported {', '.join(forbidden)}")
+            slowest = sorted((item for item in imports if item[2]), key=lambda item: -item[1])[:TOP_IMPORTS]
+            for name, cumulative, _ in slowest:
+                print(f"  {cumulative:8.1f} ms  {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
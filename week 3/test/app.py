@@ -1,7 +1,13 @@
 import sys
 import csv
-import matplotlib.pyplot as plt
-from pyhtml import html, body, h1, table, tr, td, th
+
+# matplotlib and pyhtml are imported where they are first used, so a student
+# report doesn't pay for matplotlib. Charts use the non-interactive Agg backend.
+def pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
 
 def read_csv():
     data = []
@@ -21,6 +27,7 @@ def read_csv():
     return data
 
 def generate_student_html(student_data):
+    from pyhtml import html, body, h1, table, tr, td
     rows = [tr(td(student["student_id"]), td(student["course_id"]), td(student["marks"])) for student in student_data]
     total_marks = sum([student["marks"] for student in student_data])
     rows.append(tr(td("Total Marks"), td(""), td(str(total_marks))))
@@ -33,6 +40,7 @@ def generate_student_html(student_data):
     )
 
 def generate_course_html(course_data, avg_marks, max_marks):
+    from pyhtml import html, body, h1, table, tr, td, th
     return html(
         body(
             h1("Course Details"),
@@ -45,6 +53,7 @@ def generate_course_html(course_data, avg_marks, max_marks):
 
 def generate_histogram(course_data):
     marks = [student["marks"] for student in course_data]
+    plt = pyplot()
     plt.hist(marks, bins=10, color='skyblue', edgecolor='black')
     plt.title("Marks Distribution")
     plt.xlabel("Marks")
@@ -1,90 +1,119 @@
 import csv
+import os
+import re
 import sys
-import matplotlib.pyplot as plt
-from jinja2 import Template
+from functools import lru_cache
 
-# read csv
-def read_csv():
-    data = []
+# matplotlib and jinja2 are imported where they are first used, so a student
+# report imports neither. Charts use the non-interactive Agg backend.
+def pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# Templates from templates/, each loaded and compiled once per process. The
+# compiled code is also kept in a bytecode cache (in the temp directory), so
+# later runs skip compiling too. auto_reload is off: no stat() of the template
+# file on every render.
+@lru_cache(maxsize=None)
+def template_env():
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES),
+        bytecode_cache=FileSystemBytecodeCache(),
+        auto_reload=False,
+    )
+
+# Streams the rendered template into the file chunk by chunk, so a large table
+# is never held as one string
+def render_to_file(name, path, **context):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.writelines(template_env().get_template(name).generate(**context))
+
+# read csv one row at a time
+def iter_csv():
     with open('data.csv', mode='r') as file:
         csv_reader = csv.reader(file)
         next(csv_reader)  # Skip header
         for row in csv_reader:
-            data.append(row)
-    return data
-
-# HTML for student details
-def generate_student_html(student_data, total_marks):
-    html_template = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Student Details</title>
-    </head>
-    <body>
-        <h1>Student Details</h1>
-        <table border="1">
-            <tr>
-                <th>Student ID</th>
-                <th>Course ID</th>
-                <th>Marks</th>
-            </tr>
-            {% for row in student_data %}
-            <tr>
-                <td>{{ row[0] }}</td>
-                <td>{{ row[1] }}</td>
-                <td>{{ row[2] }}</td>
-            </tr>
-            {% endfor %}
-            <tr>
-                <td colspan="2">Total Marks</td>
-                <td>{{ total_marks }}</td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
-    template = Template(html_template)
-    html_content = template.render(student_data=student_data, total_marks=total_marks)
-    with open('output.html', 'w') as file:
-        file.write(html_content)
+            yield row
+
+# running count/sum/max and a fixed 0-100 histogram (10 bins) for one course
+def course_aggregate(identifier):
+    count = total = 0
+    max_marks = None
+    bins = [0] * 10
+    for row in iter_csv():
+        if row[1].strip() != identifier:
+            continue
+        marks = int(row[2])
+        count += 1
+        total += marks
+        if max_marks is None or marks > max_marks:
+            max_marks = marks
+        bins[min(max(marks, 0) // 10, 9)] += 1
+    return count, total, max_marks, bins
+
+# The student report is what the cron jobs run thousands of times, and
+# importing jinja2 alone takes longer than the rest of the run. So as long as
+# templates/student.html only uses {{ row[i] }} and {{ total_marks }} around
+# one {% for row in student_data %} loop, it is turned into str.format strings
+# (before, inside and after the loop) and written without jinja2, giving the
+# same HTML jinja2 would. Any other tag and jinja2 renders it as usual.
+STUDENT_LOOP = re.compile(r"{%\s*for row in student_data\s*%}|{%\s*endfor\s*%}")
+TEMPLATE_TAG = re.compile(r"{{\s*(.*?)\s*}}|{%.*?%}|{#.*?#}", re.S)
+ROW_FIELDS = {f"row[{i}]": f"{{{i}}}" for i in range(3)}
+TOTAL_FIELDS = {"total_marks": "{0}"}
+
+# Template text as a format string, or None if it has a tag not in fields
+def format_string(text, fields):
+    parts = []
+    position = 0
+    for match in TEMPLATE_TAG.finditer(text):
+        field = fields.get(match.group(1))
+        if field is None:
+            return None
+        parts += [text[position:match.start()].replace("{", "{{").replace("}", "}}"), field]
+        position = match.end()
+    parts.append(text[position:].replace("{", "{{").replace("}", "}}"))
+    return "".join(parts)
+
+@lru_cache(maxsize=None)
+def student_formats():
+    with open(os.path.join(TEMPLATES, 'student.html'), encoding='utf-8') as file:
+        source = file.read()
+    if source.endswith('\n'):
+        source = source[:-1]  # jinja2 drops a single trailing newline
+    parts = STUDENT_LOOP.split(source)
+    if len(parts) != 3:
+        return None
+    head, row, tail = parts
+    formats = (format_string(head, TOTAL_FIELDS), format_string(row, ROW_FIELDS), format_string(tail, TOTAL_FIELDS))
+    return None if None in formats else formats
+
+# HTML for student details, written row by row
+def generate_student_html(student_data, total_marks, path='output.html'):
+    formats = student_formats()
+    if formats is None:
+        render_to_file('student.html', path, student_data=student_data, total_marks=total_marks)
+        return
+    head, row, tail = formats
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(head.format(total_marks))
+        file.writelines(row.format(*values) for values in student_data)
+        file.write(tail.format(total_marks))
 
 # HTML for course details and histogram
-def generate_course_html(course_data, avg_marks, max_marks):
-    html_template = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Course Details</title>
-    </head>
-    <body>
-        <h1>Course Details</h1>
-        <table border="1">
-            <tr>
-                <th>Average Marks</th>
-                <th>Maximum Marks</th>
-            </tr>
-            <tr>
-                <td>{{ avg_marks }}</td>
-                <td>{{ max_marks }}</td>
-            </tr>
-        </table>
-        <h2>Histogram of Marks</h2>
-        <img src="marks_histogram.png" alt="Marks Histogram">
-    </body>
-    </html>
-    """
-    template = Template(html_template)
-    html_content = template.render(avg_marks=avg_marks, max_marks=max_marks)
-    with open('output.html', 'w') as file:
-        file.write(html_content)
+def generate_course_html(bins, avg_marks, max_marks, path='output.html'):
+    render_to_file('course.html', path, avg_marks=avg_marks, max_marks=max_marks)
 
+    plt = pyplot()
     plt.figure()
-    plt.hist(course_data, bins=10, edgecolor='black')
+    edges = list(range(0, 101, 10))
+    plt.hist(edges[:-1], bins=edges, weights=bins, edgecolor='black')
     plt.title('Marks Histogram')
     plt.xlabel('Marks')
     plt.ylabel('Frequency')
@@ -99,10 +128,8 @@ def main():
     option = sys.argv[1]
     identifier = sys.argv[2]
     
-    data = read_csv()
-
     if option == '-s':
-        student_data = [row for row in data if row[0] == identifier]
+        student_data = [row for row in iter_csv() if row[0] == identifier]
         if not student_data:
             print("Error: Student ID not found.")
             return
@@ -110,17 +137,16 @@ def main():
         generate_student_html(student_data, total_marks)
 
     elif option == '-c':
-        course_data = [int(row[2]) for row in data if row[1].strip() == identifier]
+        count, total, max_marks, bins = course_aggregate(identifier)
         
-        print(f"Filtered course data for course ID {identifier}: {course_data}")
+        print(f"Filtered course data for course ID {identifier}: {count} rows")
         
-        if not course_data:
+        if not count:
             print("Error: Course ID not found.")
             return
         
-        avg_marks = sum(course_data) / len(course_data)
-        max_marks = max(course_data)
-        generate_course_html(course_data, avg_marks, max_marks)
+        avg_marks = total / count
+        generate_course_html(bins, avg_marks, max_marks)
 
     else:
         print("Error: Invalid option. Use '-s' for student ID or '-c' for course ID.")
@@ -0,0 +1,117 @@
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+import app
+
+# Time to write student reports with week 3's pyhtml tree, a new jinja2
+# Template per call (how this app used to do it), the shared Environment
+# (rendered to one string, and streamed to the file) and the format strings
+# app.py makes from the template (test_app.py checks they give the same
+# HTML). Also the first load of a template with and without the bytecode
+# cache, and peak memory for one very large report.
+# Usage: python bench_render.py [reports] [large report rows]   (default 10,000 and 200,000)
+
+DEFAULT_REPORTS = 10_000
+DEFAULT_LARGE_ROWS = 200_000
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES = os.path.join(HERE, 'templates')
+
+def load_week3_app():
+    week3 = os.path.dirname(HERE)
+    sys.path.insert(0, week3)
+    spec = importlib.util.spec_from_file_location('week3_app', os.path.join(week3, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def make_reports(count, rng):
+    reports = []
+    for i in range(count):
+        student_id = str(1000 + i)
+        reports.append([(student_id, str(2000 + rng.randrange(50)), str(rng.randint(0, 100)))
+                        for _ in range(rng.randint(1, 8))])
+    return reports
+
+def total(rows):
+    return sum(int(row[2]) for row in rows)
+
+def write_pyhtml(week3_app, rows, path):
+    with open(path, 'w') as f:
+        f.write(str(week3_app.generate_student_html([(int(a), int(b), int(c)) for a, b, c in rows])))
+
+def write_per_call_template(source, rows, path):
+    html_content = Template(source).render(student_data=rows, total_marks=total(rows))
+    with open(path, 'w') as f:
+        f.write(html_content)
+
+def write_environment_render(rows, path):
+    template = app.template_env().get_template('student.html')
+    html_content = template.render(student_data=rows, total_marks=total(rows))
+    with open(path, 'w') as f:
+        f.write(html_content)
+
+def write_environment_stream(rows, path):
+    app.render_to_file('student.html', path, student_data=rows, total_marks=total(rows))
+
+def write_strings(rows, path):
+    app.generate_student_html(rows, total(rows), path)
+
+def first_load_ms(bytecode_cache):
+    env = Environment(loader=FileSystemLoader(TEMPLATES), bytecode_cache=bytecode_cache, auto_reload=False)
+    start = time.perf_counter()
+    env.get_template('student.html')
+    return (time.perf_counter() - start) * 1000
+
+def peak_mib(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+def main():
+    reports = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REPORTS
+    large_rows = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LARGE_ROWS
+    rng = random.Random(42)
+    data = make_reports(reports, rng)
+    week3_app = load_week3_app()
+    with open(os.path.join(TEMPLATES, 'student.html')) as f:
+        source = f.read()
+
+    paths = {
+        'pyhtml': lambda rows, path: write_pyhtml(week3_app, rows, path),
+        'Template per call': lambda rows, path: write_per_call_template(source, rows, path),
+        'Environment render': write_environment_render,
+        'Environment stream': write_environment_stream,
+        'format strings': write_strings,
+    }
+    with tempfile.TemporaryDirectory() as out:
+        print(f"{reports:,} student reports")
+        print(f"{'path':<20}{'total s':>10}{'per report ms':>15}")
+        for name, write in paths.items():
+            start = time.perf_counter()
+            for i, rows in enumerate(data):
+                write(rows, os.path.join(out, f'student_{i}.html'))
+            elapsed = time.perf_counter() - start
+            print(f"{name:<20}{elapsed:>10.2f}{elapsed / reports * 1000:>15.3f}")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            compiled = first_load_ms(None)
+            first_load_ms(FileSystemBytecodeCache(cache_dir))
+            cached = first_load_ms(FileSystemBytecodeCache(cache_dir))
+        print(f"\nFirst get_template: {compiled:.2f} ms compiling, {cached:.2f} ms from the bytecode cache")
+
+        rows = [('1000', str(2000 + i % 50), str(i % 101)) for i in range(large_rows)]
+        path = os.path.join(out, 'large.html')
+        print(f"\nOne report with {len(rows):,} rows, peak Python memory while rendering:")
+        print(f"  Environment render  {peak_mib(lambda: write_environment_render(rows, path)):>8.2f} MiB")
+        print(f"  Environment stream  {peak_mib(lambda: write_environment_stream(rows, path)):>8.2f} MiB")
+        print(f"  format strings      {peak_mib(lambda: write_strings(rows, path)):>8.2f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+import app
+
+# The student report is written from templates/student.html without jinja2;
+# it has to give the same HTML as rendering the template.
+# Run with: python -m pytest test_app.py
+
+ROWS = [["1001", "2001", "56"], ["1001", "2002", "<b>&"], ["1001", "2003", "{0}"]]
+
+
+def read(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+def test_student_report_matches_template(tmp_path):
+    assert app.student_formats() is not None  # the template is written without jinja2
+    app.generate_student_html(ROWS, 123, tmp_path / "strings.html")
+    app.render_to_file("student.html", tmp_path / "template.html", student_data=ROWS, total_marks=123)
+
+    assert read(tmp_path / "strings.html") == read(tmp_path / "template.html")
+
+
+def test_unsupported_tag_falls_back_to_jinja2():
+    assert app.format_string("<td>{{ row[0] | upper }}</td>", app.ROW_FIELDS) is None
+    assert app.format_string("{% if total_marks %}x{% endif %}", app.TOTAL_FIELDS) is None
+    assert app.format_string("a { b } {{ row[1] }}", app.ROW_FIELDS) == "a {{ b }} {1}"
@@ -0,0 +1,102 @@
+import numpy as np
+from marks_store import HISTOGRAM_BINS, MAX_MARKS
+
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+
+
+# Per-course statistics as arrays, one entry per course in `keys` order
+class CourseStatistics:
+    def __init__(self, keys, counts, mean, minimum, maximum, std, percentiles, bins):
+        self.keys = keys
+        self.counts = counts
+        self.mean = mean
+        self.min = minimum
+        self.max = maximum
+        self.std = std
+        self.percentiles = percentiles  # {q: array}
+        self.bins = bins  # shape (courses, HISTOGRAM_BINS)
+        self.slot = {int(key): i for i, key in enumerate(keys)}
+
+    def __contains__(self, course_id):
+        return course_id in self.slot
+
+    def summary(self, course_id):
+        i = self.slot.get(course_id)
+        if i is None:
+            return None
+        return {
+            "count": int(self.counts[i]),
+            "mean": float(self.mean[i]),
+            "min": int(self.min[i]),
+            "max": int(self.max[i]),
+            "median": float(self.percentiles[50][i]),
+            "std": float(self.std[i]),
+            "percentiles": {q: float(values[i]) for q, values in self.percentiles.items()},
+            "bins": self.bins[i].tolist(),
+        }
+
+    def as_dict(self):
+        return {int(key): self.summary(int(key)) for key in self.keys}
+
+
+def _as_int32(column):
+    return np.frombuffer(column, dtype=np.int32)
+
+
+# Statistics for every course (or just `course_ids`) of a MarksStore in one
+# vectorized pass. The store's course index already lists each course's rows
+# contiguously, so marks[rows] is grouped and reduceat can work per group.
+def course_statistics(store, course_ids=None, percentiles=DEFAULT_PERCENTILES):
+    percentiles = sorted(set(percentiles) | {50})
+    index = store.by_course
+    keys = _as_int32(index.keys)
+    offsets = _as_int32(index.offsets).astype(np.int64)
+    rows = _as_int32(index.rows)
+
+    if course_ids is not None:
+        slots = np.array(sorted(index.slot[key] for key in set(course_ids) if key in index), dtype=np.int64)
+        keys = keys[slots]
+        starts, ends = offsets[slots], offsets[slots + 1]
+        counts = ends - starts
+        rows = rows[np.concatenate([np.arange(a, b) for a, b in zip(starts, ends)] or [np.empty(0, np.int64)])]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+    else:
+        counts = np.diff(offsets)
+
+    courses = len(keys)
+    if not courses:
+        empty = np.empty(0)
+        return CourseStatistics(keys, counts, empty, empty, empty, empty,
+                                {q: empty for q in percentiles}, np.empty((0, HISTOGRAM_BINS), np.int64))
+
+    grouped = _as_int32(store.marks)[rows]
+    starts = offsets[:-1]
+    group = np.repeat(np.arange(courses), counts)
+
+    mean = np.add.reduceat(grouped, starts, dtype=np.int64) / counts
+    minimum = np.minimum.reduceat(grouped, starts)
+    maximum = np.maximum.reduceat(grouped, starts)
+    deviation = grouped - mean[group]
+    std = np.sqrt(np.add.reduceat(deviation * deviation, starts) / counts)
+
+    # Sort marks within each course (one sort on a combined course/marks key),
+    # then interpolate linearly between the closest ranks, which is the same
+    # definition as np.percentile's default
+    lowest = int(minimum.min())
+    span = int(maximum.max()) - lowest + 1
+    offset = group * span - lowest
+    ordered = np.sort(grouped + offset) - offset
+    quantiles = {}
+    for q in percentiles:
+        position = (counts - 1) * (q / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        low = ordered[starts + lower]
+        high = ordered[starts + upper]
+        quantiles[q] = low + (high - low) * (position - lower)
+
+    bin_of = np.clip(grouped.astype(np.int64) * HISTOGRAM_BINS // MAX_MARKS, 0, HISTOGRAM_BINS - 1)
+    bins = np.bincount(group * HISTOGRAM_BINS + bin_of, minlength=courses * HISTOGRAM_BINS)
+    bins = bins.reshape(courses, HISTOGRAM_BINS)
+
+    return CourseStatistics(keys, counts, mean, minimum, maximum, std, quantiles, bins)
@@ -1,17 +1,124 @@
-from flask import Flask, render_template, request, redirect, url_for
-import csv
-import matplotlib.pyplot as plt
+from flask import Flask, render_template, request, redirect, url_for, abort, make_response
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-import base64
+from matplotlib.figure import Figure
+from marks_store import DataError, MarksStore, bin_edges, parse_id
+from analytics import course_statistics
+from instrumentation import RENDER_SECONDS, init_instrumentation, logger, timed
 
 app = Flask(__name__)
+init_instrumentation(app)
 
-# Function to read the CSV file and return the data
-def read_csv():
-    with open('data.csv', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        data = list(reader)
-    return data
+# data.csv loaded once per process with every course's aggregates precomputed.
+# The file's mtime/size is re-checked at most every check_interval seconds and
+# the data reloaded when it changes. on_load(version, courses) is called with
+# each newly loaded version before requests can see it.
+class DataCache:
+    def __init__(self, path, check_interval=1.0, on_load=None):
+        self.path = path
+        self.check_interval = check_interval
+        self.on_load = on_load
+        self.lock = threading.Lock()
+        self.checked_at = 0.0
+        self.snapshot = None  # (version, store, course aggregates)
+
+    def get(self):
+        now = time.monotonic()
+        if self.snapshot is None or now - self.checked_at >= self.check_interval:
+            with self.lock:
+                if self.snapshot is None or now - self.checked_at >= self.check_interval:
+                    self.refresh()
+                    self.checked_at = now
+        return self.snapshot
+
+    def refresh(self):
+        stat = os.stat(self.path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if self.snapshot is None or self.snapshot[0] != version:
+            try:
+                store = MarksStore.load(self.path)
+            except DataError as error:
+                # Keep serving the last good data; the next check tries again
+                if self.snapshot is None:
+                    raise
+                logger.error("Not reloading %s: %s", self.path, error)
+                return
+            courses = course_statistics(store).as_dict()
+            if self.on_load is not None:
+                self.on_load(version, courses)
+            self.snapshot = (version, store, courses)
+            logger.info("Loaded %s: %d rows, %d courses", self.path, len(store.marks), len(courses))
+
+def version_tag(version):
+    return '%x-%x' % version
+
+# Draw on a standalone Figure (no global pyplot state) so renders are thread-safe
+def render_histogram(course_id, bins):
+    with timed(RENDER_SECONDS, 'histogram'):
+        fig = Figure()
+        ax = fig.subplots()
+        edges = bin_edges()
+        ax.hist(edges[:-1], bins=edges, weights=bins, edgecolor='black')
+        ax.set_title(f"Marks Distribution for Course {course_id}")
+        ax.set_xlabel('Marks')
+        ax.set_ylabel('Frequency')
+        img = BytesIO()
+        fig.savefig(img, format='png')
+        return img.getvalue()
+
+# PNG bytes per course for the current data version, rendered off-request in
+# a pool of `workers` threads. Every course is queued as soon as a new data
+# version loads (renders still queued for the old one are cancelled), so a
+# request never waits for a render: get() returns None until the image is
+# ready. A render that raised is dropped and queued again by the next request.
+# All of a version's images are kept, one PNG of a few tens of KB per course.
+class HistogramCache:
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='histogram')
+        self.lock = threading.Lock()
+        self.version = None
+        self.futures = {}
+
+    def prerender(self, version, courses):
+        with self.lock:
+            for future in self.futures.values():
+                future.cancel()
+            self.version = version
+            self.futures = {course_id: self.executor.submit(render_histogram, course_id, course['bins'])
+                            for course_id, course in courses.items()}
+            submitted = list(self.futures.items())
+        for course_id, future in submitted:
+            self.watch(course_id, future)
+
+    # The PNG bytes, or None while the render is queued or running (or the
+    # request is for a version that has since been replaced)
+    def get(self, version, course_id, course):
+        with self.lock:
+            if version != self.version:
+                return None
+            future = self.futures.get(course_id)
+            submitted = future is None
+            if submitted:
+                future = self.futures[course_id] = self.executor.submit(render_histogram, course_id, course['bins'])
+        if submitted:
+            self.watch(course_id, future)
+        return future.result() if future.done() else None
+
+    # Outside the lock: the callback runs right away if the render already finished
+    def watch(self, course_id, future):
+        future.add_done_callback(lambda done: self.forget_failed(course_id, done))
+
+    def forget_failed(self, course_id, future):
+        if not future.cancelled() and future.exception() is not None:
+            with self.lock:
+                if self.futures.get(course_id) is future:
+                    del self.futures[course_id]
+
+histogram_cache = HistogramCache()
+data_cache = DataCache('data.csv', on_load=histogram_cache.prerender)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -24,47 +131,66 @@ def index():
         if not id_value:
             return render_template('error.html', message="ID value cannot be empty!", back_link=url_for('index'))
         
-        data = read_csv()
+        key = parse_id(id_value)
+        version, store, courses = data_cache.get()
 
         if id_type == 'student_id':
-            # Filter data by Student ID
-            student_data = [row for row in data if row['Student id'] == id_value]
+            student_data = store.student_rows(key)
             
             if not student_data:
                 return render_template('error.html', message="Student ID not found!", back_link=url_for('index'))
             
-            total_marks = sum(int(row[' Marks']) for row in student_data)
+            total_marks = sum(marks for _, _, marks in student_data)
             
             return render_template('student_details.html', student_data=student_data, total_marks=total_marks)
         
         elif id_type == 'course_id':
-            # Filter data by Course ID
-            course_data = [row for row in data if row[' Course id'] == id_value]
+            course = courses.get(key)
             
-            if not course_data:
+            if course is None:
                 return render_template('error.html', message="Course ID not found!", back_link=url_for('index'))
 
-            # Calculate average and max marks
-            marks = [int(row[' Marks']) for row in course_data]
-            average_marks = sum(marks) / len(marks)
-            maximum_marks = max(marks)
-
-            # Create histogram
-            img = BytesIO()
-            plt.hist(marks, bins=10, edgecolor='black')
-            plt.title(f"Marks Distribution for Course {id_value}")
-            plt.xlabel('Marks')
-            plt.ylabel('Frequency')
-            plt.savefig(img, format='png')
-            img.seek(0)
-            plot_url = base64.b64encode(img.getvalue()).decode('utf8')
-
-            return render_template('course_details.html', average_marks=average_marks, maximum_marks=maximum_marks, plot_url=plot_url)
+            average_marks = course['mean']
+            maximum_marks = course['max']
+
+            # The histogram is served separately by course_histogram()
+            return render_template('course_details.html', average_marks=average_marks, maximum_marks=maximum_marks,
+                                   course_id=key, version=version_tag(version))
         
         else:
             return render_template('error.html', message="Invalid input selected!", back_link=url_for('index'))
     
     return render_template('index.html')
 
+@app.route('/course/<int:course_id>/histogram.png')
+def course_histogram(course_id):
+    version, _, courses = data_cache.get()
+    course = courses.get(course_id)
+    if course is None:
+        abort(404)
+
+    etag = f"{version_tag(version)}-{course_id}"
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        png = histogram_cache.get(version, course_id, course)
+        if png is None:
+            # Only in the first moments after a data load, while the renders run
+            response = make_response('', 503)
+            response.headers['Retry-After'] = '1'
+            response.cache_control.no_store = True
+            return response
+        response = make_response(png)
+        response.mimetype = 'image/png'
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response
+
+# data.csv has a bad row and there's no earlier version to fall back on
+@app.errorhandler(DataError)
+def data_error(error):
+    return render_template('error.html', message=str(error), back_link=url_for('index')), 503
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,168 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from marks_store import MarksStore
+from analytics import course_statistics
+from app import app, render_histogram
+
+# Renders every student page, every course page with its histogram and an
+# index into a static directory, from the same templates as app.py, so the
+# results can be served by any static file server:
+#   index.html, student/<id>.html, course/<id>.html, course/<id>.png, static/
+# Each file's inputs (its rows or course aggregates, plus the template) are
+# hashed into OUT/.manifest.json and only files whose hash changed are
+# rendered again, split across worker processes. Files of students or
+# courses no longer in the data are removed.
+# Usage: python export_site.py [--data data.csv] [--out site] [--workers N] [--force]
+
+MANIFEST = '.manifest.json'
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else repr(part).encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def read_bytes(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+# url_for() for the templates, as paths relative to a page `depth` folders
+# below the site root
+def site_url_for(depth):
+    root = '../' * depth
+
+    def url_for(endpoint, **values):
+        if endpoint == 'index':
+            return root + 'index.html'
+        if endpoint == 'static':
+            return root + 'static/' + values['filename']
+        if endpoint == 'student_page':
+            return f"{root}student/{values['student_id']}.html"
+        if endpoint == 'course_page':
+            return f"{root}course/{values['course_id']}.html"
+        if endpoint == 'course_histogram':
+            return f"{root}course/{values['course_id']}.png?v={values['v']}"
+        raise ValueError(f"No static page for {endpoint}")
+    return url_for
+
+
+def render_template(name, depth, **context):
+    return app.jinja_env.get_template(name).render(url_for=site_url_for(depth), **context).encode()
+
+
+# Written to a temporary file first so a server never sees half a page
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+
+
+# Site files as {path: (hash, job)}; a job is the (kind, args) that renders it
+def plan_site(store, courses):
+    templates = {name: read_bytes(os.path.join(HERE, 'templates', name))
+                 for name in ('site_index.html', 'student_details.html', 'course_details.html')}
+    files = {}
+    for student_id in store.students():
+        rows = store.student_rows(student_id)
+        files[f'student/{student_id}.html'] = (digest(templates['student_details.html'], rows),
+                                              ('student', (rows,)))
+    for course_id, course in courses.items():
+        histogram_hash = digest(course_id, course['bins'])
+        files[f'course/{course_id}.png'] = (histogram_hash, ('histogram', (course_id, course['bins'])))
+        # The page links the image by its hash, so it changes when the image does
+        page = (course_id, course['mean'], course['max'], histogram_hash[:12])
+        files[f'course/{course_id}.html'] = (digest(templates['course_details.html'], page), ('course', page))
+    index = (store.students(), list(courses))
+    files['index.html'] = (digest(templates['site_index.html'], index), ('index', index))
+    static_dir = os.path.join(HERE, 'static')
+    for name in sorted(os.listdir(static_dir)):
+        content = read_bytes(os.path.join(static_dir, name))
+        files[f'static/{name}'] = (digest(content), ('copy', (content,)))
+    return files
+
+
+def render_file(kind, args):
+    if kind == 'student':
+        rows, = args
+        return render_template('student_details.html', 1, student_data=rows,
+                               total_marks=sum(marks for _, _, marks in rows))
+    if kind == 'course':
+        course_id, average_marks, maximum_marks, version = args
+        return render_template('course_details.html', 1, average_marks=average_marks,
+                               maximum_marks=maximum_marks, course_id=course_id, version=version)
+    if kind == 'histogram':
+        return render_histogram(*args)
+    if kind == 'index':
+        students, courses = args
+        return render_template('site_index.html', 0, students=students, courses=courses)
+    return args[0]
+
+
+# Worker process: render and write one share of the changed files
+def render_files(out, jobs):
+    for path, (kind, args) in jobs:
+        write_file(os.path.join(out, path), render_file(kind, args))
+    return len(jobs)
+
+
+def load_manifest(out):
+    try:
+        with open(os.path.join(out, MANIFEST)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def export_site(data, out, workers=None, force=False):
+    store = MarksStore.load(data)
+    courses = course_statistics(store).as_dict()
+    files = plan_site(store, courses)
+
+    old = {} if force else load_manifest(out)
+    changed = [(path, job) for path, (file_hash, job) in files.items()
+               if old.get(path) != file_hash or not os.path.exists(os.path.join(out, path))]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(changed)))
+    if changed:
+        # Interleaved shares, so the slower histograms spread across workers
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(render_files, [out] * workers, [changed[i::workers] for i in range(workers)]))
+
+    removed = [path for path in old if path not in files]
+    for path in removed:
+        try:
+            os.remove(os.path.join(out, path))
+        except FileNotFoundError:
+            pass
+    # The manifest goes last: after a failed build the missing files are redone
+    write_file(os.path.join(out, MANIFEST),
+               json.dumps({path: file_hash for path, (file_hash, _) in files.items()}, indent=0).encode())
+    return len(changed), len(files), len(removed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the student and course pages as a static site")
+    parser.add_argument('--data', default='data.csv')
+    parser.add_argument('--out', default='site')
+    parser.add_argument('--workers', type=int, help="worker processes, one per CPU by default")
+    parser.add_argument('--force', action='store_true', help="render every file again")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    changed, total, removed = export_site(args.data, args.out, args.workers, args.force)
+    print(f"{args.out}: rendered {changed} of {total} files, removed {removed}, "
+          f"in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
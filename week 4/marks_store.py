@@ -0,0 +1,255 @@
+import csv
+import mmap
+import os
+import struct
+from array import array
+
+# Fixed histogram bins used by the streaming aggregates: marks 0-100 in 10 bins
+HISTOGRAM_BINS = 10
+MAX_MARKS = 100
+
+# Binary sidecar written next to the CSV: a header recording the CSV's mtime and
+# size, then the int32 columns and both indexes back to back
+CACHE_SUFFIX = '.cache'
+CACHE_MAGIC = b'MRKS0001'
+CACHE_HEADER = struct.Struct('<8sqqqqq')  # magic, mtime_ns, size, rows, students, courses
+
+# IDs and marks are stored as int32
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+
+# A CSV row that isn't three whole numbers; the message names the file and line
+class DataError(ValueError):
+    pass
+
+
+# Turn an ID typed on the command line (or read from the CSV) into the int key
+# used by the store, or None when it is not a number
+def parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Row numbers grouped by key: sorted keys, a flat array of row numbers and the
+# offsets where each key's rows start, plus a hash from key to its slot
+class GroupIndex:
+    def __init__(self, keys, offsets, rows):
+        self.keys = keys
+        self.offsets = offsets
+        self.rows = rows
+        self.slot = {key: i for i, key in enumerate(keys)}
+
+    @classmethod
+    def build(cls, column):
+        groups = {}
+        for row, key in enumerate(column):
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = array('i')
+            group.append(row)
+
+        keys = array('i', sorted(groups))
+        offsets = array('i', [0])
+        rows = array('i')
+        for key in keys:
+            rows.extend(groups[key])
+            offsets.append(len(rows))
+        return cls(keys, offsets, rows)
+
+    def __contains__(self, key):
+        return key in self.slot
+
+    def lookup(self, key):
+        i = self.slot.get(key)
+        if i is None:
+            return self.rows[0:0]
+        return self.rows[self.offsets[i]:self.offsets[i + 1]]
+
+
+# data.csv parsed once into three int columns with student and course indexes
+class MarksStore:
+    def __init__(self, student_ids, course_ids, marks, by_student=None, by_course=None):
+        self.student_ids = student_ids
+        self.course_ids = course_ids
+        self.marks = marks
+        self.by_student = GroupIndex.build(student_ids) if by_student is None else by_student
+        self.by_course = GroupIndex.build(course_ids) if by_course is None else by_course
+
+    # Map the sidecar cache if it matches the CSV, otherwise parse and rewrite it
+    @classmethod
+    def load(cls, path):
+        stat = os.stat(path)
+        cache_path = path + CACHE_SUFFIX
+        store = cls.from_cache(cache_path, stat)
+        if store is None:
+            store = cls.from_csv(path)
+            try:
+                store.write_cache(cache_path, stat)
+            except OSError:
+                pass  # read-only directory: just skip caching
+        return store
+
+    @classmethod
+    def from_cache(cls, cache_path, stat):
+        try:
+            with open(cache_path, 'rb') as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(buffer) < CACHE_HEADER.size:
+            return None
+        magic, mtime_ns, size, rows, students, courses = CACHE_HEADER.unpack_from(buffer)
+        if magic != CACHE_MAGIC or mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+            return None
+
+        # Zero-copy int32 views into the mapped file
+        view = memoryview(buffer)
+        offset = CACHE_HEADER.size
+        columns = []
+        for length in (rows, rows, rows, students, students + 1, rows, courses, courses + 1, rows):
+            end = offset + length * 4
+            columns.append(view[offset:end].cast('i'))
+            offset = end
+        if offset != len(buffer):
+            return None
+        by_student = GroupIndex(*columns[3:6])
+        by_course = GroupIndex(*columns[6:9])
+        return cls(columns[0], columns[1], columns[2], by_student, by_course)
+
+    def write_cache(self, cache_path, stat):
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(CACHE_HEADER.pack(CACHE_MAGIC, stat.st_mtime_ns, stat.st_size, len(self),
+                                         len(self.by_student.keys), len(self.by_course.keys)))
+            for column in (self.student_ids, self.course_ids, self.marks,
+                           self.by_student.keys, self.by_student.offsets, self.by_student.rows,
+                           self.by_course.keys, self.by_course.offsets, self.by_course.rows):
+                file.write(column)
+        os.replace(tmp_path, cache_path)
+
+    @classmethod
+    def from_csv(cls, path):
+        student_ids = array('i')
+        course_ids = array('i')
+        marks = array('i')
+        for student_id, course_id, value in iter_csv(path):
+            student_ids.append(student_id)
+            course_ids.append(course_id)
+            marks.append(value)
+        return cls(student_ids, course_ids, marks)
+
+    def __len__(self):
+        return len(self.marks)
+
+    def students(self):
+        return list(self.by_student.keys)
+
+    def courses(self):
+        return list(self.by_course.keys)
+
+    # (student_id, course_id, marks) for every row of one student
+    def student_rows(self, student_id):
+        return [(self.student_ids[row], self.course_ids[row], self.marks[row])
+                for row in self.by_student.lookup(student_id)]
+
+    def course_marks(self, course_id):
+        marks = self.marks
+        return [marks[row] for row in self.by_course.lookup(course_id)]
+
+    # Count/sum/max/histogram for every course from one pass over the columns
+    def course_aggregates(self):
+        courses = {key: CourseAggregate() for key in self.by_course.keys}
+        for course_id, value in zip(self.course_ids, self.marks):
+            courses[course_id].add(value)
+        return courses
+
+    # Count/sum/max/histogram for one course, None if unknown
+    def course_aggregate(self, course_id):
+        rows = self.by_course.lookup(course_id)
+        if not len(rows):
+            return None
+        aggregate = CourseAggregate()
+        marks = self.marks
+        for row in rows:
+            aggregate.add(marks[row])
+        return aggregate
+
+    # (count, average, maximum) for one course in a single pass, None if unknown
+    def course_stats(self, course_id):
+        marks = self.marks
+        count = total = 0
+        maximum = None
+        for row in self.by_course.lookup(course_id):
+            value = marks[row]
+            count += 1
+            total += value
+            if maximum is None or value > maximum:
+                maximum = value
+        if not count:
+            return None
+        return count, total / count, maximum
+
+
+def bin_edges():
+    width = MAX_MARKS / HISTOGRAM_BINS
+    return [i * width for i in range(HISTOGRAM_BINS + 1)]
+
+
+# Running count/sum/max and fixed-bin histogram for one course
+class CourseAggregate:
+    __slots__ = ('count', 'total', 'maximum', 'bins')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.maximum = None
+        self.bins = [0] * HISTOGRAM_BINS
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        self.bins[min(max(value, 0) * HISTOGRAM_BINS // MAX_MARKS, HISTOGRAM_BINS - 1)] += 1
+
+    @property
+    def average(self):
+        return self.total / self.count
+
+
+# Yield (student_id, course_id, marks) rows without loading the whole file.
+# Blank lines are skipped; any other row that isn't three whole numbers in the
+# int32 range raises DataError.
+def iter_csv(path):
+    with open(path, mode='r', newline='') as file:
+        csv_reader = csv.reader(file)
+        next(csv_reader, None)  # Skip header
+        for row in csv_reader:
+            if not any(field.strip() for field in row):
+                continue
+            try:
+                values = int(row[0]), int(row[1]), int(row[2])
+            except (IndexError, ValueError):
+                raise DataError(f"{path} line {csv_reader.line_num}: expected student_id, course_id, marks "
+                                f"as whole numbers, got {','.join(row)!r}") from None
+            if not all(INT_MIN <= value <= INT_MAX for value in values):
+                raise DataError(f"{path} line {csv_reader.line_num}: value out of range in {','.join(row)!r}")
+            yield values
+
+
+# One pass over the CSV keeping only per-course aggregates and the rows of the
+# requested student, so memory stays flat however large the file is
+def stream_report(path, student_id=None):
+    student_rows = []
+    courses = {}
+    for row in iter_csv(path):
+        aggregate = courses.get(row[1])
+        if aggregate is None:
+            aggregate = courses[row[1]] = CourseAggregate()
+        aggregate.add(row[2])
+        if row[0] == student_id:
+            student_rows.append(row)
+    return student_rows, courses
@@ -1,11 +1,25 @@
-from flask import Flask, render_template, request, redirect, url_for
+import csv
+import io
+import os
+from flask import Flask, render_template, request, redirect, url_for, jsonify, stream_template
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from sqlite_profile import apply_pragmas, engine_options
+from instrumentation import init_instrumentation, logger
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.sqlite3'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///database.sqlite3')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['STUDENTS_PER_PAGE'] = 50
+app.config['MAX_STUDENTS_PER_PAGE'] = 500
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLITE_PROFILE'])
 
 db = SQLAlchemy(app)
+apply_pragmas(app, db)
+init_instrumentation(app, db)
 
 # Database Models
 class Student(db.Model):
@@ -13,23 +27,187 @@ class Student(db.Model):
     roll_number = db.Column(db.String, unique=True, nullable=False)
     first_name = db.Column(db.String, nullable=False)
     last_name = db.Column(db.String)
+    # Enrollments go with their student or course: the database deletes them
+    # (ON DELETE CASCADE) without the ORM loading them first
+    enrollments = db.relationship('Enrollment', back_populates='student', order_by='Enrollment.id',
+                                  cascade='all, delete-orphan', passive_deletes=True)
 
 class Course(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     course_code = db.Column(db.String, unique=True, nullable=False)
     course_name = db.Column(db.String, nullable=False)
     course_description = db.Column(db.String)
+    enrollments = db.relationship('Enrollment', back_populates='course',
+                                  cascade='all, delete-orphan', passive_deletes=True)
 
 class Enrollment(db.Model):
+    # One row per (student, course); the unique index also serves student_id
+    # lookups, the second one course_id lookups
+    __table_args__ = (
+        db.Index('uq_enrollment_student_course', 'student_id', 'course_id', unique=True),
+        db.Index('ix_enrollment_course_student', 'course_id', 'student_id'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id', ondelete='CASCADE'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id', ondelete='CASCADE'), nullable=False)
+    student = db.relationship('Student', back_populates='enrollments')
+    course = db.relationship('Course', back_populates='enrollments')
+
+# SQLite caps bound parameters per statement, so IN (...) lookups are chunked
+IN_CHUNK = 500
+
+def parse_course_ids(values):
+    return {int(value) for value in values if str(value).strip().isdigit()}
+
+# The subset of course_ids that exist, in one IN (...) query per chunk
+def existing_course_ids(course_ids):
+    course_ids = list(course_ids)
+    found = set()
+    for i in range(0, len(course_ids), IN_CHUNK):
+        chunk = course_ids[i:i + IN_CHUNK]
+        found.update(db.session.execute(db.select(Course.id).where(Course.id.in_(chunk))).scalars())
+    return found
+
+def existing_roll_numbers(rolls):
+    found = {}
+    for i in range(0, len(rolls), IN_CHUNK):
+        chunk = rolls[i:i + IN_CHUNK]
+        rows = db.session.execute(db.select(Student.roll_number, Student.id).where(Student.roll_number.in_(chunk)))
+        found.update((roll, student_id) for roll, student_id in rows)
+    return found
+
+# A record's course IDs: a list, or IDs separated by ';' as in the CSV.
+# None for any other type.
+def record_courses(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part for part in value.split(';') if part.strip()]
+    if isinstance(value, list):
+        return value
+    return None
+
+# Records are dicts with roll_number, first_name, last_name and courses.
+# Students and enrollments are bulk inserted and committed as one transaction;
+# a roll number another request adds in the meantime raises IntegrityError.
+# Records that can't be imported are listed in 'skipped' with their position
+# in the request and the reason.
+def import_students(records):
+    students = {}
+    skipped = []
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            skipped.append({'index': index, 'reason': 'not an object'})
+            continue
+        roll = record.get('roll_number')
+        roll = str(roll).strip() if isinstance(roll, (str, int)) else ''
+        if not roll:
+            reason = 'missing roll_number'
+        elif not record.get('first_name'):
+            reason = 'missing first_name'
+        elif not isinstance(record['first_name'], str):
+            reason = 'first_name must be a string'
+        elif not isinstance(record.get('last_name'), (str, type(None))):
+            reason = 'last_name must be a string'
+        elif roll in students:
+            reason = 'duplicate roll_number'
+        elif record_courses(record.get('courses')) is None:
+            reason = "courses must be a list or IDs separated by ';'"
+        else:
+            students[roll] = (index, record)
+            continue
+        skipped.append({'index': index, 'roll_number': roll, 'reason': reason} if roll else
+                       {'index': index, 'reason': reason})
+
+    existing = existing_roll_numbers(list(students))
+    skipped.extend({'index': students[roll][0], 'roll_number': roll, 'reason': 'roll_number already exists'}
+                   for roll in existing)
+    skipped.sort(key=lambda item: item['index'])
+    new = [roll for roll in students if roll not in existing]
+    if not new:
+        return {'created': 0, 'enrollments': 0, 'skipped': skipped, 'unknown_courses': []}
+
+    students = {roll: record for roll, (_, record) in students.items()}
+    wanted = {roll: parse_course_ids(record_courses(students[roll].get('courses'))) for roll in new}
+    valid = existing_course_ids(set().union(*wanted.values()))
+
+    db.session.execute(insert(Student), [{
+        'roll_number': roll,
+        'first_name': students[roll]['first_name'],
+        'last_name': students[roll].get('last_name'),
+    } for roll in new])
+    ids = existing_roll_numbers(new)
+    enrollments = [{'student_id': ids[roll], 'course_id': course_id}
+                   for roll in new for course_id in sorted(wanted[roll] & valid)]
+    if enrollments:
+        db.session.execute(insert(Enrollment), enrollments)
+    db.session.commit()
+
+    unknown = sorted(set().union(*wanted.values()) - valid)
+    return {'created': len(new), 'enrollments': len(enrollments), 'skipped': skipped, 'unknown_courses': unknown}
+
+# CSV columns: roll_number, first_name, last_name, courses (IDs separated by ';')
+def read_import_csv(text):
+    records = []
+    for row in csv.DictReader(io.StringIO(text)):
+        row = {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        row['courses'] = [value for value in row.get('courses', '').split(';') if value.strip()]
+        records.append(row)
+    return records
+
+# Upper bound for a roll number prefix range scan: 'R12' -> 'R13'
+def prefix_upper_bound(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+# One page of students in id order, seeking from a cursor instead of using OFFSET.
+# A roll number prefix becomes a range over the unique roll_number index.
+# Returns (students, prev_cursor, next_cursor).
+def student_page(size, after=None, before=None, prefix=None):
+    query = Student.query
+    if prefix:
+        query = query.filter(Student.roll_number >= prefix, Student.roll_number < prefix_upper_bound(prefix))
+
+    if before is not None:
+        students = query.filter(Student.id < before).order_by(Student.id.desc()).limit(size + 1).all()
+        has_more = len(students) > size
+        students = students[:size][::-1]
+        prev_cursor = students[0].id if has_more else None
+        next_cursor = students[-1].id if students else None
+    else:
+        if after is not None:
+            query = query.filter(Student.id > after)
+        students = query.order_by(Student.id).limit(size + 1).all()
+        has_more = len(students) > size
+        students = students[:size]
+        prev_cursor = students[0].id if after is not None and students else None
+        next_cursor = students[-1].id if has_more else None
+    return students, prev_cursor, next_cursor
 
 # Home Route
 @app.route('/')
 def home():
-    students = Student.query.all()
-    return render_template('index.html', students=students)
+    size = request.args.get('size', app.config['STUDENTS_PER_PAGE'], type=int)
+    size = max(1, min(size, app.config['MAX_STUDENTS_PER_PAGE']))
+    prefix = request.args.get('q', '').strip()
+    students, prev_cursor, next_cursor = student_page(
+        size, request.args.get('after', type=int), request.args.get('before', type=int), prefix)
+    return render_template('index.html', students=students, size=size, q=prefix,
+                           prev_cursor=prev_cursor, next_cursor=next_cursor)
+
+# All students in id order, fetched lazily one keyset chunk at a time
+def iter_students(chunk=1000):
+    after = 0
+    while True:
+        students = Student.query.filter(Student.id > after).order_by(Student.id).limit(chunk).all()
+        if not students:
+            return
+        yield from students
+        after = students[-1].id
+
+# Every student in one response, rendered and sent in chunks as rows are fetched
+@app.route('/student/export')
+def export_students():
+    return stream_template('index.html', students=iter_students(), export=True)
 
 @app.route('/student/create', methods=['GET', 'POST'])
 def create_student():
@@ -42,26 +220,39 @@ def create_student():
         if Student.query.filter_by(roll_number=roll).first():
             return render_template('error.html', message='Roll Number already exists!')
         
+        # Unknown course IDs are skipped; the rest are enrolled in the same commit
+        requested = parse_course_ids(courses_selected)
+        course_ids = existing_course_ids(requested)
         student = Student(roll_number=roll, first_name=f_name, last_name=l_name)
+        student.enrollments = [Enrollment(course_id=course_id) for course_id in sorted(course_ids)]
         db.session.add(student)
         db.session.commit()
-        
-        print(f"Selected courses: {courses_selected}")
-
-        for course_id in courses_selected:
-            course = Course.query.get(course_id)  
-            if course:
-                enrollment = Enrollment(student_id=student.id, course_id=int(course_id))
-                db.session.add(enrollment)
-                print(f"Enrolled student {student.roll_number} in course {course.course_code}")
-            else:
-                print(f"Course with ID {course_id} does not exist!")
-        
-        db.session.commit()  
+        logger.debug("Created student %s enrolled in courses %s", roll, sorted(course_ids))
+        if requested - course_ids:
+            logger.info("Student %s: skipped unknown course IDs %s", roll, sorted(requested - course_ids))
         
         return redirect(url_for('home'))
     return render_template('add_student.html')
 
+# Bulk import: JSON list (or {"students": [...]}) or a CSV upload/body
+@app.route('/student/import', methods=['POST'])
+def import_students_route():
+    if request.is_json:
+        data = request.get_json()
+        records = data.get('students', []) if isinstance(data, dict) else data
+    elif 'file' in request.files:
+        records = read_import_csv(request.files['file'].read().decode('utf-8-sig'))
+    else:
+        records = read_import_csv(request.get_data(as_text=True))
+    if not isinstance(records, list):
+        return jsonify({'message': 'Expected a list of students'}), 400
+    try:
+        result = import_students(records)
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'A roll number was added while importing; nothing was imported, try again'}), 409
+    return jsonify(result), 201
+
 # Update Student Route
 @app.route('/student/<int:student_id>/update', methods=['GET', 'POST'])
 def update_student(student_id):
@@ -77,25 +268,18 @@ def update_student(student_id):
 @app.route('/student/<int:student_id>/delete')
 def delete_student(student_id):
     student = Student.query.get_or_404(student_id)
-    Enrollment.query.filter_by(student_id=student.id).delete()
     db.session.delete(student)
     db.session.commit()
     return redirect(url_for('home'))
 
 @app.route('/student/<int:student_id>')
 def student_details(student_id):
-    student = Student.query.get_or_404(student_id)
-    enrollments = Enrollment.query.filter_by(student_id=student.id).all()
-    print(f"Enrollments for student {student.roll_number}: {[e.course_id for e in enrollments]}")
-
-    courses = []
-    for enrollment in enrollments:
-        course = Course.query.get(enrollment.course_id)
-        if course:
-            courses.append(course)
-            print(f"Found course: {course.course_code}")
-        else:
-            print(f"Course with ID {enrollment.course_id} does not exist!")
+    # Student, enrollments and courses in one joined query
+    student = Student.query.options(
+        joinedload(Student.enrollments).joinedload(Enrollment.course)
+    ).filter_by(id=student_id).first_or_404()
+    courses = [enrollment.course for enrollment in student.enrollments if enrollment.course]
+    logger.debug("Student %s has %d enrollments", student.roll_number, len(courses))
 
     return render_template('student_details.html', student=student, courses=courses)
 
@@ -1,10 +1,18 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+import os
+from flask import Flask, render_template, request, redirect, url_for, flash, stream_template
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert
+from sqlite_profile import apply_pragmas, engine_options
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.sqlite3'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///database.sqlite3')
 app.config['SECRET_KEY'] = 'your_secret_key'
+app.config['STUDENTS_PER_PAGE'] = 50
+app.config['MAX_STUDENTS_PER_PAGE'] = 500
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLITE_PROFILE'])
 db = SQLAlchemy(app)
+apply_pragmas(app, db)
 
 class Student(db.Model):
     student_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -19,18 +27,71 @@ class Course(db.Model):
     course_description = db.Column(db.String)
 
 class Enrollment(db.Model):
+    # One row per (student, course); the unique index also serves student_id
+    # lookups, the second one course_id lookups
+    __table_args__ = (
+        db.Index('uq_enrollment_student_course', 'student_id', 'course_id', unique=True),
+        db.Index('ix_enrollment_course_student', 'course_id', 'student_id'),
+    )
     enrollment_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student.student_id'), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey('course.course_id'), nullable=False)
+    # Deleting a student or course deletes its enrollments in the database
+    student_id = db.Column(db.Integer, db.ForeignKey('student.student_id', ondelete='CASCADE'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.course_id', ondelete='CASCADE'), nullable=False)
 
 def create_tables():
     with app.app_context():
         db.create_all()
 
+# Upper bound for a roll number prefix range scan: 'R12' -> 'R13'
+def prefix_upper_bound(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+# One page of students in student_id order using keyset (seek) pagination.
+# Returns (students, prev_cursor, next_cursor).
+def student_page(size, after=None, before=None, prefix=None):
+    query = Student.query
+    if prefix:
+        query = query.filter(Student.roll_number >= prefix, Student.roll_number < prefix_upper_bound(prefix))
+
+    if before is not None:
+        students = query.filter(Student.student_id < before).order_by(Student.student_id.desc()).limit(size + 1).all()
+        has_more = len(students) > size
+        students = students[:size][::-1]
+        prev_cursor = students[0].student_id if has_more else None
+        next_cursor = students[-1].student_id if students else None
+    else:
+        if after is not None:
+            query = query.filter(Student.student_id > after)
+        students = query.order_by(Student.student_id).limit(size + 1).all()
+        has_more = len(students) > size
+        students = students[:size]
+        prev_cursor = students[0].student_id if after is not None and students else None
+        next_cursor = students[-1].student_id if has_more else None
+    return students, prev_cursor, next_cursor
+
 @app.route('/')
 def index():
-    students = Student.query.all()
-    return render_template('index.html', students=students)
+    size = request.args.get('size', app.config['STUDENTS_PER_PAGE'], type=int)
+    size = max(1, min(size, app.config['MAX_STUDENTS_PER_PAGE']))
+    prefix = request.args.get('q', '').strip()
+    students, prev_cursor, next_cursor = student_page(
+        size, request.args.get('after', type=int), request.args.get('before', type=int), prefix)
+    return render_template('index.html', students=students, size=size, q=prefix,
+                           prev_cursor=prev_cursor, next_cursor=next_cursor)
+
+def iter_students(chunk=1000):
+    after = 0
+    while True:
+        students = Student.query.filter(Student.student_id > after).order_by(Student.student_id).limit(chunk).all()
+        if not students:
+            return
+        yield from students
+        after = students[-1].student_id
+
+# Streams the full student list instead of building it in memory
+@app.route('/student/export')
+def export_students():
+    return stream_template('index.html', students=iter_students(), export=True)
 
 @app.route('/student/create', methods=['GET', 'POST'])
 def create_student():
@@ -43,14 +104,21 @@ def create_student():
         if Student.query.filter_by(roll_number=roll).first():
             return render_template('already_exists.html')
 
+        course_ids = {int(course.split('_')[1]) for course in courses}  # Assuming course_1, course_2, etc.
+        # Keep only courses that exist, checked with a single IN (...) query
+        if course_ids:
+            course_ids = db.session.execute(
+                db.select(Course.course_id).where(Course.course_id.in_(course_ids))
+            ).scalars().all()
+
         new_student = Student(roll_number=roll, first_name=f_name, last_name=l_name)
         db.session.add(new_student)
-        db.session.commit()
+        db.session.flush()  # assigns new_student.student_id inside the transaction
 
-        for course in courses:
-            course_id = int(course.split('_')[1])  # Assuming course_1, course_2, etc.
-            new_enrollment = Enrollment(student_id=new_student.student_id, course_id=course_id)
-            db.session.add(new_enrollment)
+        if course_ids:
+            db.session.execute(insert(Enrollment), [
+                {'student_id': new_student.student_id, 'course_id': course_id} for course_id in sorted(course_ids)
+            ])
 
         db.session.commit()
         return redirect(url_for('index'))
@@ -0,0 +1,180 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from flask import Response, g, has_app_context, request
+from sqlalchemy import event
+
+# Request, SQL and render timings for the Flask apps, served on /metrics in
+# the Prometheus text format, plus the apps' logger.
+#   init_instrumentation(app, db=None) hooks it all into an app (and its
+#   Flask-SQLAlchemy engine)
+#   logger.debug(...) etc. instead of print()
+# Config (or the environment variable of the same name):
+#   LOG_LEVEL       logger level, WARNING by default
+#   SLOW_QUERY_MS   log statements slower than this many ms; off when unset
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Messages are queued and written by a background thread, so a log call on
+# the request path never waits for the terminal or a file
+logger = logging.getLogger("app")
+logger.propagate = False
+log_queue = SimpleQueue()
+logger.addHandler(QueueHandler(log_queue))
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+log_listener = QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+logger.setLevel(os.environ.get("LOG_LEVEL", "WARNING").upper())
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.series = {}  # label values -> [count per bucket..., count above, sum]
+
+    def observe(self, value, *labels):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 2)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = sorted((labels, list(values)) for labels, values in self.series.items())
+        for labels, values in series:
+            base = "".join(f'{name}="{escape(value)}",' for name, value in zip(self.label_names, labels))
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values[:-1]):
+                total += count
+                lines.append(f'{self.name}_bucket{{{base}le="{bound}"}} {total}')
+            base = base.rstrip(",")
+            lines.append(f"{self.name}_sum{{{base}}} {values[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {total}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def inc(self, *labels):
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            series = sorted(self.series.items())
+        for labels, value in series:
+            base = ",".join(f'{name}="{escape(value)}"' for name, value in zip(self.label_names, labels))
+            lines.append(f"{self.name}{{{base}}} {value}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route",
+                            ("method", "route", "status"))
+REQUEST_STATEMENTS = Histogram("http_request_sql_statements", "SQL statements run per request",
+                               ("method", "route"), COUNT_BUCKETS)
+SQL_SECONDS = Histogram("sql_statement_duration_seconds", "SQL statement latency by verb", ("verb",))
+SLOW_STATEMENTS = Counter("sql_slow_statements_total", "Statements slower than SLOW_QUERY_MS", ("verb",))
+RENDER_SECONDS = Histogram("render_duration_seconds", "Time spent drawing and encoding charts", ("chart",))
+METRICS = [REQUEST_SECONDS, REQUEST_STATEMENTS, SQL_SECONDS, SLOW_STATEMENTS, RENDER_SECONDS]
+
+
+# with timed(RENDER_SECONDS, "histogram"): ...
+@contextmanager
+def timed(histogram, *labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, *labels)
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+def config_value(app, name):
+    value = app.config.get(name, os.environ.get(name))
+    return None if value in (None, "") else value
+
+
+def instrument_requests(app, count_statements):
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+        if count_statements:
+            g.sql_statements = 0
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop("request_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, route, response.status_code)
+            if "sql_statements" in g:
+                REQUEST_STATEMENTS.observe(g.pop("sql_statements"), request.method, route)
+        return response
+
+
+def instrument_engine(engine, slow_query_ms=None):
+    slow_seconds = slow_query_ms / 1000 if slow_query_ms is not None else None
+
+    # The start time goes on the statement's execution context, which is
+    # dropped with it, so a statement that fails leaves nothing behind
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "EMPTY"
+        SQL_SECONDS.observe(elapsed, verb)
+        if has_app_context() and "sql_statements" in g:
+            g.sql_statements += 1
+        if slow_seconds is not None and elapsed >= slow_seconds:
+            SLOW_STATEMENTS.inc(verb)
+            logger.warning("slow query (%.1f ms): %s", elapsed * 1000, statement)
+
+
+def init_instrumentation(app, db=None):
+    if config_value(app, "LOG_LEVEL"):
+        logger.setLevel(config_value(app, "LOG_LEVEL").upper())
+    instrument_requests(app, count_statements=db is not None)
+    if db is not None:
+        slow_query_ms = config_value(app, "SLOW_QUERY_MS")
+        with app.app_context():
+            instrument_engine(db.engine, float(slow_query_ms) if slow_query_ms is not None else None)
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
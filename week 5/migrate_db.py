@@ -0,0 +1,75 @@
+import os
+import re
+import sqlite3
+import sys
+
+# Brings databases created from older versions of the models up to date.
+# Usage: python migrate_db.py [database ...]
+
+DEFAULT_DATABASES = ["instance/database.sqlite3", "blackbox/instance/database.sqlite3"]
+
+# Enrollment indexes: drop duplicate (student, course) rows, keeping the oldest,
+# so the unique index can be built
+DEDUPE_ENROLLMENTS = """
+DELETE FROM enrollment WHERE rowid NOT IN (
+    SELECT MIN(rowid) FROM enrollment GROUP BY student_id, course_id
+)
+"""
+ENROLLMENT_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_enrollment_student_course ON enrollment (student_id, course_id)",
+    "CREATE INDEX IF NOT EXISTS ix_enrollment_course_student ON enrollment (course_id, student_id)",
+]
+
+# ON DELETE CASCADE foreign keys. SQLite can't alter a foreign key, so a table
+# whose foreign keys don't cascade yet is rebuilt from its own CREATE TABLE
+# with them added. Only rows whose parents still exist are copied over, so
+# this also drops the orphans left by deletes before the cascade existed.
+CASCADE_TABLES = ["enrollment"]
+REFERENCES = re.compile(r'(REFERENCES\s+"?\w+"?\s*\([^)]*\))(?!\s*ON DELETE)', re.IGNORECASE)
+
+def add_delete_cascade(conn, table):
+    # foreign_key_list rows: id, seq, table, from, to, on_update, on_delete, match
+    foreign_keys = conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+    if all(fk[6] == "CASCADE" for fk in foreign_keys):
+        return 0
+    (create,) = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    indexes = [sql for (sql,) in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))]
+    (rows,) = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+
+    conn.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    conn.execute(REFERENCES.sub(r"\1 ON DELETE CASCADE", create))
+    parents = " AND ".join(f"{fk[3]} IN (SELECT {fk[4]} FROM {fk[2]})" for fk in foreign_keys)
+    copied = conn.execute(f"INSERT INTO {table} SELECT * FROM {table}_old WHERE {parents}").rowcount
+    conn.execute(f"DROP TABLE {table}_old")
+    for sql in indexes:
+        conn.execute(sql)
+    return rows - copied
+
+def migrate(path):
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        removed = conn.execute(DEDUPE_ENROLLMENTS).rowcount
+        for statement in ENROLLMENT_INDEXES:
+            conn.execute(statement)
+        orphans = sum(add_delete_cascade(conn, table) for table in CASCADE_TABLES)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    print(f"{path}: enrollment indexes and cascades in place, {removed} duplicate and {orphans} orphaned "
+          f"enrollments removed")
+
+def main():
+    paths = sys.argv[1:] or [path for path in DEFAULT_DATABASES if os.path.exists(path)]
+    if not paths:
+        print("No database found")
+        return
+    for path in paths:
+        migrate(path)
+
+if __name__ == "__main__":
+    main()
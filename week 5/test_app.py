@@ -0,0 +1,75 @@
+import importlib
+import os
+import pytest
+from sqlalchemy import event
+
+# Regression checks for the week 5 app on a throwaway database.
+# Run with: python -m pytest test_app.py
+
+ENROLLMENTS = 60
+
+
+@pytest.fixture(scope="module")
+def week5(tmp_path_factory):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.sqlite3'}"
+    module = importlib.import_module("app")
+    with module.app.app_context():
+        module.db.create_all()
+        student = module.Student(roll_number="R1", first_name="Test", last_name="Student")
+        courses = [module.Course(course_code=f"C{i}", course_name=f"Course {i}") for i in range(ENROLLMENTS)]
+        student.enrollments = [module.Enrollment(course=course) for course in courses]
+        module.db.session.add(student)
+        module.db.session.commit()
+        student_id = student.id
+    yield module, student_id
+    os.environ.pop("DATABASE_URL")
+
+
+def test_student_details_is_one_query(week5):
+    module, student_id = week5
+    client = module.app.test_client()
+    client.get(f"/student/{student_id}")  # opens the pooled connection (and runs its PRAGMAs)
+
+    statements = []
+    with module.app.app_context():
+        engine = module.db.engine
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = client.get(f"/student/{student_id}")
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    assert response.data.count(b"<td>Course ") == ENROLLMENTS
+    assert len(statements) == 1, statements
+
+
+def test_import_skips_records_with_non_string_names(week5):
+    module, _ = week5
+    client = module.app.test_client()
+    response = client.post("/student/import", json=[
+        {"roll_number": "I1", "first_name": "Valid"},
+        {"roll_number": "I2", "first_name": {"a": 1}},
+        {"roll_number": "I3", "first_name": "Bad", "last_name": ["x"]},
+    ])
+
+    assert response.status_code == 201
+    assert response.json["created"] == 1
+    assert [(item["index"], item["reason"]) for item in response.json["skipped"]] == [
+        (1, "first_name must be a string"), (2, "last_name must be a string")]
+
+
+def test_import_roll_number_added_meanwhile_is_409(week5, monkeypatch):
+    module, _ = week5
+    client = module.app.test_client()
+    # R1 exists, but the check runs as if another request inserted it afterwards
+    monkeypatch.setattr(module, "existing_roll_numbers", lambda rolls: {})
+    response = client.post("/student/import", json=[{"roll_number": "R1", "first_name": "Again"}])
+    monkeypatch.undo()
+
+    assert response.status_code == 409
+    assert client.post("/student/import", json=[{"roll_number": "I4", "first_name": "Next"}]).status_code == 201
@@ -1,12 +1,36 @@
-from flask import Flask, request, jsonify
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import Flask, request, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_restful import Api, Resource
+from flask_restful.utils import unpack
+from sqlalchemy import DDL, event, func, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
+from sqlite_profile import apply_pragmas, engine_options
+from instrumentation import init_instrumentation
+from db_schema import SEARCH_SCHEMA, TABLE_VERSION_SCHEMA
+
+# orjson is optional; responses are encoded with the stdlib json without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///api_database.sqlite3'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///api_database.sqlite3')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLITE_PROFILE'])
 db = SQLAlchemy(app)
+apply_pragmas(app, db)
+init_instrumentation(app, db)
 api = Api(app)
 
 # Database Models
@@ -26,35 +50,229 @@ class Student(db.Model):
 
 class Enrollment(db.Model):
     __tablename__ = 'enrollment'
+    # One row per (student, course); the unique index also serves student_id
+    # lookups, the second one course_id lookups
+    __table_args__ = (
+        db.Index('uq_enrollment_student_course', 'student_id', 'course_id', unique=True),
+        db.Index('ix_enrollment_course_student', 'course_id', 'student_id'),
+    )
     enrollment_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student.student_id'), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey('course.course_id'), nullable=False)
+    # Deleting a student or course deletes its enrollments in the database
+    student_id = db.Column(db.Integer, db.ForeignKey('student.student_id', ondelete='CASCADE'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.course_id', ondelete='CASCADE'), nullable=False)
+
+class CourseEnrollmentCount(db.Model):
+    __tablename__ = 'course_enrollment_count'
+    # Enrollments per course, kept in step with the enrollment table by every
+    # write below so /api/course/stats reads one row per course instead of
+    # counting enrollments. Deleting the course deletes its row. migrate_db.py
+    # creates and fills it for old databases.
+    course_id = db.Column(db.Integer, db.ForeignKey('course.course_id', ondelete='CASCADE'), primary_key=True)
+    student_count = db.Column(db.Integer, nullable=False, default=0)
+
+# Full-text search index over student and course names and codes (FTS5),
+# kept in step by triggers, so every write path (ORM, bulk inserts, other
+# processes) updates it. Its rowid encodes the row it indexes:
+# 2 * student_id for students, 2 * course_id + 1 for courses. The response
+# cache's table_version counters are trigger-maintained the same way.
+# db.create_all() creates both; migrate_db.py adds them to old databases. The
+# SQL is in db_schema.py.
+for statement in SEARCH_SCHEMA + TABLE_VERSION_SCHEMA:
+    event.listen(db.metadata, "after_create", DDL(statement))
+
+# Adds `student_count` to a course's counter, creating the row if needed.
+# Executed with one parameter dict per course.
+ENROLLMENT_COUNT_UPSERT = sqlite_insert(CourseEnrollmentCount)
+ENROLLMENT_COUNT_UPSERT = ENROLLMENT_COUNT_UPSERT.on_conflict_do_update(
+    index_elements=["course_id"],
+    set_={"student_count": CourseEnrollmentCount.student_count + ENROLLMENT_COUNT_UPSERT.excluded.student_count},
+)
+
+def enrollment_count_params(deltas):
+    return [{"course_id": course_id, "student_count": delta} for course_id, delta in deltas.items() if delta]
+
+# deltas: {course_id: change in enrollments}; part of the caller's transaction
+def adjust_enrollment_counts(deltas):
+    params = enrollment_count_params(deltas)
+    if params:
+        db.session.execute(ENROLLMENT_COUNT_UPSERT, params)
+
+# The counter changes for removing all of a student's enrollments
+def student_enrollment_deltas(student_id):
+    course_ids = db.session.execute(db.select(Enrollment.course_id).where(Enrollment.student_id == student_id))
+    return Counter({course_id: -1 for (course_id,) in course_ids})
+
+# JSON encoding
+# Every resource returns plain dicts/lists (built from column rows, see
+# as_dict/fetch_row) and this representation encodes them, with orjson when
+# it is installed
+def dumps(data):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+@api.representation("application/json")
+def output_json(data, code, headers=None):
+    return Response(dumps(data) + b"\n", status=code, headers=headers, mimetype="application/json")
+
+# Response dict from an ORM object or a result row
+def as_dict(obj, fields):
+    return {name: getattr(obj, name) for name in fields}
+
+# Just the `fields` columns of one row, without loading an ORM object
+def fetch_row(model, fields, key, value):
+    columns = [getattr(model, name) for name in fields]
+    return db.session.execute(db.select(*columns).where(getattr(model, key) == value)).first()
 
 # Error Handling
+# Returned as a plain dict so Flask-RESTful serializes it like any other response
 def error_response(error_code, error_message, status_code=400):
-    return jsonify({"error_code": error_code, "error_message": error_message}), status_code
+    return {"error_code": error_code, "error_message": error_message}, status_code
+
+# Response cache for the GET endpoints
+# A cached response is reused while the versions of the tables it was built
+# from are unchanged, and its ETag is derived from those versions, so
+# If-None-Match is answered with one small query. The versions are kept in
+# the database's table_version table and bumped by triggers (db_schema.py),
+# so writes from other processes and scripts invalidate this process's cache
+# too. They're read before the response is built: a write that lands in
+# between only makes the entry look older than it is.
+RESPONSE_CACHE_SIZE = 1024
+VERSIONS_SQL = db.text("SELECT name, version FROM table_version")
+response_cache = OrderedDict()  # request path -> (versions, body, status, headers)
+cache_lock = threading.Lock()
+cache_stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+def table_versions():
+    return dict(db.session.execute(VERSIONS_SQL).all())
+
+def count(stat):
+    with cache_lock:
+        cache_stats[stat] += 1
+
+def cached_get(*tables):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if wants_ndjson():
+                return method(self, *args, **kwargs)  # streamed, never cached
+            key = request.full_path
+            current = table_versions()
+            versions = tuple(current[table] for table in tables)
+            etag = hashlib.sha1(f"{key}|{versions}".encode()).hexdigest()[:16]
+            if request.if_none_match.contains(etag):
+                count("not_modified")
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            with cache_lock:
+                entry = response_cache.get(key)
+                if entry and entry[0] == versions:
+                    response_cache.move_to_end(key)
+                    cache_stats["hits"] += 1
+                else:
+                    entry = None
+                    cache_stats["misses"] += 1
+            if entry is None:
+                data, status, headers = unpack(method(self, *args, **kwargs))
+                rendered = api.make_response(data, status, headers=headers)
+                entry = (versions, rendered.get_data(), rendered.status_code, dict(rendered.headers))
+                with cache_lock:
+                    response_cache[key] = entry
+                    response_cache.move_to_end(key)
+                    while len(response_cache) > RESPONSE_CACHE_SIZE:
+                        response_cache.popitem(last=False)
+
+            response = Response(entry[1], status=entry[2], headers=entry[3])
+            response.set_etag(etag)
+            response.cache_control.no_cache = True  # clients should revalidate each poll
+            return response
+        return wrapper
+    return decorator
+
+class CacheStatsAPI(Resource):
+    def get(self):
+        versions = table_versions()
+        with cache_lock:
+            return {**cache_stats, "entries": len(response_cache), "versions": versions}, 200
+
+# Collection GETs
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+COURSE_FIELDS = ("course_id", "course_name", "course_code", "course_description")
+STUDENT_FIELDS = ("student_id", "roll_number", "first_name", "last_name")
+ENROLLMENT_FIELDS = ("enrollment_id", "student_id", "course_id")
+NDJSON = "application/x-ndjson"
+NDJSON_BATCH = 1000  # rows fetched and encoded per chunk
+
+# ?format=ndjson or Accept: application/x-ndjson
+def wants_ndjson():
+    return (request.args.get("format") == "ndjson"
+            or request.accept_mimetypes.best_match(["application/json", NDJSON]) == NDJSON)
+
+# One JSON object per line, fetched and encoded NDJSON_BATCH rows at a time
+# so the whole collection never sits in memory
+def ndjson_response(query, fields):
+    def generate():
+        result = db.session.execute(query.execution_options(yield_per=NDJSON_BATCH))
+        for rows in result.partitions():
+            yield b"".join(dumps(dict(zip(fields, row[1:]))) + b"\n" for row in rows)
+    return Response(stream_with_context(generate()), mimetype=NDJSON)
+
+# Upper bound for a prefix range scan: 'CS1' -> 'CS2'
+def prefix_upper_bound(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+# One page of a table in primary-key order: ?limit=<n>&after=<key>&fields=a,b.
+# Only the requested columns are selected. When more rows follow, a Link
+# header (rel="next") and X-Next-Cursor point at the next page. As NDJSON
+# every row from `after` on is streamed instead, unless ?limit is given.
+def paginated_list(model, key, fields, *criteria):
+    limit = max(1, min(request.args.get("limit", DEFAULT_PAGE_LIMIT, type=int), MAX_PAGE_LIMIT))
+    after = request.args.get("after", type=int)
+    selected = fields
+    if request.args.get("fields"):
+        selected = tuple(dict.fromkeys(name.strip() for name in request.args["fields"].split(",") if name.strip()))
+        unknown = [name for name in selected if name not in fields]
+        if unknown or not selected:
+            return error_response("QUERY001", f"Unknown fields: {', '.join(unknown)}")
+
+    key_column = getattr(model, key)
+    query = db.select(key_column, *[getattr(model, name) for name in selected]).where(*criteria)
+    if after is not None:
+        query = query.where(key_column > after)
+    query = query.order_by(key_column)
+    if wants_ndjson():
+        if "limit" in request.args:
+            query = query.limit(limit)
+        return ndjson_response(query, selected)
+    rows = db.session.execute(query.limit(limit + 1)).all()
+
+    headers = {}
+    if len(rows) > limit:
+        cursor = rows[limit - 1][0]
+        params = request.args.to_dict()
+        params["after"] = cursor
+        headers["Link"] = f'<{request.base_url}?{urlencode(params)}>; rel="next"'
+        headers["X-Next-Cursor"] = str(cursor)
+    return [dict(zip(selected, row[1:])) for row in rows[:limit]], 200, headers
 
 # Course APIs
 class CourseAPI(Resource):
+    @cached_get("course")
     def get(self, course_id=None):
         if course_id:
-            course = Course.query.get(course_id)
+            course = fetch_row(Course, COURSE_FIELDS, "course_id", course_id)
             if not course:
                 return {"message": "Course not found"}, 404
-            return {
-                "course_id": course.course_id,
-                "course_name": course.course_name,
-                "course_code": course.course_code,
-                "course_description": course.course_description
-            }, 200
+            return as_dict(course, COURSE_FIELDS), 200
         else:
-            courses = Course.query.all()
-            return [{
-                "course_id": course.course_id,
-                "course_name": course.course_name,
-                "course_code": course.course_code,
-                "course_description": course.course_description
-            } for course in courses], 200
+            criteria = []
+            code_prefix = request.args.get("course_code")
+            if code_prefix:
+                criteria += [Course.course_code >= code_prefix, Course.course_code < prefix_upper_bound(code_prefix)]
+            return paginated_list(Course, "course_id", COURSE_FIELDS, *criteria)
 
     def post(self):
         data = request.get_json()
@@ -71,12 +289,7 @@ class CourseAPI(Resource):
             )
             db.session.add(new_course)
             db.session.commit()
-            return {
-                "course_id": new_course.course_id,
-                "course_name": new_course.course_name,
-                "course_code": new_course.course_code,
-                "course_description": new_course.course_description
-            }, 201
+            return as_dict(new_course, COURSE_FIELDS), 201
         except IntegrityError:
             db.session.rollback()
             return error_response("COURSE003", "Course Code already exists", 409)
@@ -90,12 +303,7 @@ class CourseAPI(Resource):
         course.course_code = data.get("course_code", course.course_code)
         course.course_description = data.get("course_description", course.course_description)
         db.session.commit()
-        return {
-            "course_id": course.course_id,
-            "course_name": course.course_name,
-            "course_code": course.course_code,
-            "course_description": course.course_description
-        }, 200
+        return as_dict(course, COURSE_FIELDS), 200
 
     def delete(self, course_id):
         course = Course.query.get(course_id)
@@ -107,25 +315,18 @@ class CourseAPI(Resource):
 
 # Student APIs
 class StudentAPI(Resource):
+    @cached_get("student")
     def get(self, student_id=None):
         if student_id:
-            student = Student.query.get(student_id)
+            student = fetch_row(Student, STUDENT_FIELDS, "student_id", student_id)
             if not student:
                 return {"message": "Student not found"}, 404
-            return {
-                "student_id": student.student_id,
-                "roll_number": student.roll_number,
-                "first_name": student.first_name,
-                "last_name": student.last_name
-            }, 200
+            return as_dict(student, STUDENT_FIELDS), 200
         else:
-            students = Student.query.all()
-            return [{
-                "student_id": student.student_id,
-                "roll_number": student.roll_number,
-                "first_name": student.first_name,
-                "last_name": student.last_name
-            } for student in students], 200
+            criteria = []
+            if request.args.get("roll_number"):
+                criteria.append(Student.roll_number == request.args["roll_number"])
+            return paginated_list(Student, "student_id", STUDENT_FIELDS, *criteria)
 
     def post(self):
         data = request.get_json()
@@ -142,12 +343,7 @@ class StudentAPI(Resource):
             )
             db.session.add(new_student)
             db.session.commit()
-            return {
-                "student_id": new_student.student_id,
-                "roll_number": new_student.roll_number,
-                "first_name": new_student.first_name,
-                "last_name": new_student.last_name
-            }, 201
+            return as_dict(new_student, STUDENT_FIELDS), 201
         except IntegrityError:
             db.session.rollback()
             return error_response("STUDENT003", "Roll Number already exists", 409)
@@ -161,35 +357,29 @@ class StudentAPI(Resource):
         student.first_name = data.get("first_name", student.first_name)
         student.last_name = data.get("last_name", student.last_name)
         db.session.commit()
-        return {
-            "student_id": student.student_id,
-            "roll_number": student.roll_number,
-            "first_name": student.first_name,
-            "last_name": student.last_name
-        }, 200
+        return as_dict(student, STUDENT_FIELDS), 200
 
     def delete(self, student_id):
         student = Student.query.get(student_id)
         if not student:
             return {"message": "Student not found"}, 404
+        adjust_enrollment_counts(student_enrollment_deltas(student_id))
         db.session.delete(student)
         db.session.commit()
         return {"message": "Successfully Deleted"}, 200
 
 # Enrollment APIs
 class EnrollmentAPI(Resource):
+    @cached_get("student", "enrollment")
     def get(self, student_id):
-        student = Student.query.get(student_id)
-        if not student:
+        if not fetch_row(Student, ("student_id",), "student_id", student_id):
             return error_response("ENROLLMENT002", "Student does not exist")
-        enrollments = Enrollment.query.filter_by(student_id=student_id).all()
+        columns = [getattr(Enrollment, name) for name in ENROLLMENT_FIELDS]
+        enrollments = db.session.execute(db.select(*columns).where(Enrollment.student_id == student_id)
+                                         .order_by(Enrollment.enrollment_id)).all()
         if not enrollments:
             return {"message": "Student is not enrolled in any course"}, 404
-        return [{
-            "enrollment_id": enrollment.enrollment_id,
-            "student_id": enrollment.student_id,
-            "course_id": enrollment.course_id
-        } for enrollment in enrollments], 200
+        return [dict(zip(ENROLLMENT_FIELDS, row)) for row in enrollments], 200
 
     def post(self, student_id):
         student = Student.query.get(student_id)
@@ -202,12 +392,10 @@ class EnrollmentAPI(Resource):
         try:
             new_enrollment = Enrollment(student_id=student_id, course_id=course.course_id)
             db.session.add(new_enrollment)
+            db.session.flush()
+            adjust_enrollment_counts({course.course_id: 1})
             db.session.commit()
-            return {
-                "enrollment_id": new_enrollment.enrollment_id,
-                "student_id": new_enrollment.student_id,
-                "course_id": new_enrollment.course_id
-            }, 201
+            return as_dict(new_enrollment, ENROLLMENT_FIELDS), 201
         except IntegrityError:
             db.session.rollback()
             return error_response("ENROLLMENT003", "Enrollment already exists")
@@ -224,14 +412,336 @@ class EnrollmentDeleteAPI(Resource):
         if not enrollment:
             return {"message": "Enrollment for the student not found"}, 404
         db.session.delete(enrollment)
+        adjust_enrollment_counts({course_id: -1})
         db.session.commit()
         return {"message": "Successfully Deleted"}, 200
 
+# Course roster and enrollment counts
+# The roster is a student page restricted to one course's enrollments, which
+# ix_enrollment_course_student answers without touching other courses. Stats
+# come from the counter table (one row per course), or with ?source=live from
+# a GROUP BY over the same index.
+class CourseRosterAPI(Resource):
+    @cached_get("course", "student", "enrollment")
+    def get(self, course_id):
+        if not fetch_row(Course, ("course_id",), "course_id", course_id):
+            return {"message": "Course not found"}, 404
+        enrolled = db.select(Enrollment.student_id).where(Enrollment.course_id == course_id)
+        return paginated_list(Student, "student_id", STUDENT_FIELDS, Student.student_id.in_(enrolled))
+
+COURSE_STATS_FIELDS = ("course_id", "course_code", "course_name", "student_count")
+
+class CourseStatsAPI(Resource):
+    @cached_get("course", "enrollment")
+    def get(self):
+        source = request.args.get("source", "counts")
+        if source == "counts":
+            counts = db.select(CourseEnrollmentCount.course_id, CourseEnrollmentCount.student_count).subquery()
+        elif source == "live":
+            counts = (db.select(Enrollment.course_id, func.count().label("student_count"))
+                      .group_by(Enrollment.course_id).subquery())
+        else:
+            return error_response("QUERY002", "source must be counts or live")
+        rows = db.session.execute(
+            db.select(Course.course_id, Course.course_code, Course.course_name,
+                      func.coalesce(counts.c.student_count, 0))
+            .outerjoin(counts, counts.c.course_id == Course.course_id)
+            .order_by(Course.course_id)
+        ).all()
+        courses = [dict(zip(COURSE_STATS_FIELDS, row)) for row in rows]
+        return {
+            "courses": courses,
+            "total_courses": len(courses),
+            "total_enrollments": sum(course["student_count"] for course in courses),
+        }, 200
+
+# Search
+# /api/search?q=<words>&type=student|course&limit=<n>&offset=<n>. Every word
+# must match the start of a word in a name or code ('jan sm' finds Jane
+# Smith, 'cs1' finds CS101). Results come in two tiers, paged by offset as one
+# list: first the rows where every word is a whole word, ranked by bm25 with
+# names weighted over codes, so a student called Smith comes before one
+# called Smithson for 'smith'; then the rows that only match as prefixes, in
+# index order, which SQLite streams without scoring the whole match set. A
+# whole-word tier bigger than SEARCH_RANK_LIMIT (a very common surname) is
+# listed in index order too; its bm25 scores are practically all equal, and
+# scoring them all is what makes a search slow.
+SEARCH_WEIGHTS = "10.0, 10.0, 5.0, 5.0, 3.0"  # in search_index column order
+SEARCH_RANK_LIMIT = 1000
+SEARCH_COLUMNS = {"student": "{first_name last_name roll_number}", "course": "{course_code course_name}"}
+SEARCH_SELECT = f"""
+    SELECT rowid, bm25(search_index, {SEARCH_WEIGHTS}) AS score FROM search_index
+    WHERE search_index MATCH :match
+"""
+RANKED_SQL = db.text(SEARCH_SELECT + " ORDER BY score LIMIT :limit OFFSET :offset")
+INDEX_ORDER_SQL = db.text(SEARCH_SELECT + " ORDER BY rowid LIMIT :limit OFFSET :offset")
+MATCH_COUNT_SQL = db.text(
+    "SELECT count(*) FROM (SELECT 1 FROM search_index WHERE search_index MATCH :match LIMIT :limit)"
+)
+
+# 'Jan sm' -> ('"Jan" AND "sm"', '"Jan"* AND "sm"*'), the whole-word and
+# prefix queries; quoting keeps FTS5 syntax out of user input
+def search_queries(text):
+    words = re.findall(r"\w+", text)
+    return " AND ".join(f'"{word}"' for word in words), " AND ".join(f'"{word}"*' for word in words)
+
+def match_count(match, cap=-1):
+    return db.session.execute(MATCH_COUNT_SQL, {"match": match, "limit": cap}).scalar()
+
+# Up to limit + 1 (rowid, score) hits from offset on, whole-word tier first
+def search_hits(exact, prefix, limit, offset):
+    exact_count = match_count(exact, SEARCH_RANK_LIMIT + 1)
+    hits = []
+    if exact_count:
+        tier_sql = RANKED_SQL if exact_count <= SEARCH_RANK_LIMIT else INDEX_ORDER_SQL
+        hits = db.session.execute(tier_sql, {"match": exact, "limit": limit + 1, "offset": offset}).all()
+        if len(hits) > limit:
+            return hits
+        if exact_count > SEARCH_RANK_LIMIT:
+            exact_count = match_count(exact)
+    rest = f"({prefix}) NOT ({exact})" if exact_count else prefix
+    return hits + db.session.execute(INDEX_ORDER_SQL, {
+        "match": rest, "limit": limit + 1 - len(hits), "offset": max(0, offset - exact_count),
+    }).all()
+
+class SearchAPI(Resource):
+    @cached_get("student", "course")
+    def get(self):
+        exact, prefix = search_queries(request.args.get("q", ""))
+        if not exact:
+            return error_response("SEARCH001", "Search text is required")
+        kind = request.args.get("type")
+        if kind:
+            if kind not in SEARCH_COLUMNS:
+                return error_response("SEARCH002", "type must be student or course")
+            exact, prefix = (f"{SEARCH_COLUMNS[kind]} : ({match})" for match in (exact, prefix))
+        limit = max(1, min(request.args.get("limit", DEFAULT_PAGE_LIMIT, type=int), MAX_PAGE_LIMIT))
+        offset = max(0, request.args.get("offset", 0, type=int))
+        hits = search_hits(exact, prefix, limit, offset)
+
+        student_ids = [rowid // 2 for rowid, _ in hits[:limit] if rowid % 2 == 0]
+        course_ids = [rowid // 2 for rowid, _ in hits[:limit] if rowid % 2 == 1]
+        rows = {
+            ("student", row[0]): row for row in select_in(Student.student_id, student_ids,
+                                                          *[getattr(Student, name) for name in STUDENT_FIELDS])
+        }
+        rows.update(
+            (("course", row[0]), row) for row in select_in(Course.course_id, course_ids,
+                                                           *[getattr(Course, name) for name in COURSE_FIELDS])
+        )
+        results = []
+        for rowid, score in hits[:limit]:
+            kind, fields = ("student", STUDENT_FIELDS) if rowid % 2 == 0 else ("course", COURSE_FIELDS)
+            row = rows.get((kind, rowid // 2))
+            if row:
+                results.append({"type": kind, "score": round(-score, 4), **dict(zip(fields, row))})
+
+        headers = {}
+        if len(hits) > limit:
+            params = request.args.to_dict()
+            params["offset"] = offset + limit
+            headers["Link"] = f'<{request.base_url}?{urlencode(params)}>; rel="next"'
+        return results, 200, headers
+
+# Batch APIs
+# Each accepts a JSON array of up to MAX_BATCH_SIZE items, validates it with
+# set-based IN (...) queries, bulk inserts the valid items in one transaction
+# and answers 207 with a per-item status using the single-item error codes.
+MAX_BATCH_SIZE = 1000
+IN_CHUNK = 500  # stays under SQLite's bound-parameter limit
+
+def select_in(key, values, *columns):
+    values = list(values)
+    rows = []
+    for i in range(0, len(values), IN_CHUNK):
+        rows += db.session.execute(db.select(*columns).where(key.in_(values[i:i + IN_CHUNK]))).all()
+    return rows
+
+def item_error(error_code, error_message, status_code=400):
+    return {"status": status_code, "error_code": error_code, "error_message": error_message}
+
+def item_created(fields, row):
+    return {"status": 201, "data": dict(zip(fields, row))}
+
+# The request's JSON array, or an error response
+def read_batch():
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        return None, error_response("BATCH001", "Request body must be a JSON array")
+    if len(items) > MAX_BATCH_SIZE:
+        return None, error_response("BATCH002", f"Batch cannot have more than {MAX_BATCH_SIZE} items")
+    return items, None
+
+# Text fields as {name: (error code, label)}; required fields use the code of
+# their "is required" error, optional ones BATCH004
+COURSE_TEXT_FIELDS = {
+    "course_name": ("COURSE001", "Course Name"),
+    "course_code": ("COURSE002", "Course Code"),
+    "course_description": ("BATCH004", "Course Description"),
+}
+STUDENT_TEXT_FIELDS = {
+    "roll_number": ("STUDENT001", "Roll Number"),
+    "first_name": ("STUDENT002", "First Name"),
+    "last_name": ("BATCH004", "Last Name"),
+}
+
+# An item error for the first text field holding a non-string (a list, object,
+# number...), which could neither be looked up nor inserted
+def text_field_error(item, fields):
+    for name, (error_code, label) in fields.items():
+        value = item.get(name)
+        if value is not None and not isinstance(value, str):
+            return item_error(error_code, f"{label} must be a string")
+    return None
+
+class CourseBatchAPI(Resource):
+    def post(self):
+        items, error = read_batch()
+        if error:
+            return error
+        results = [None] * len(items)
+        codes = {}  # course_code -> item index
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[i] = item_error("BATCH003", "Item must be a JSON object")
+            elif field_error := text_field_error(item, COURSE_TEXT_FIELDS):
+                results[i] = field_error
+            elif not item.get("course_name"):
+                results[i] = item_error("COURSE001", "Course Name is required")
+            elif not item.get("course_code"):
+                results[i] = item_error("COURSE002", "Course Code is required")
+            elif item["course_code"] in codes:
+                results[i] = item_error("COURSE003", "Course Code already exists", 409)
+            else:
+                codes[item["course_code"]] = i
+
+        for (code,) in select_in(Course.course_code, codes, Course.course_code):
+            results[codes.pop(code)] = item_error("COURSE003", "Course Code already exists", 409)
+
+        if codes:
+            try:
+                db.session.execute(insert(Course), [{
+                    "course_name": items[i]["course_name"],
+                    "course_code": code,
+                    "course_description": items[i].get("course_description")
+                } for code, i in codes.items()])
+                columns = [getattr(Course, name) for name in COURSE_FIELDS]
+                for row in select_in(Course.course_code, codes, *columns):
+                    results[codes[row.course_code]] = item_created(COURSE_FIELDS, row)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                return error_response("COURSE003", "Course Code already exists", 409)
+        return {"results": results}, 207
+
+class StudentBatchAPI(Resource):
+    def post(self):
+        items, error = read_batch()
+        if error:
+            return error
+        results = [None] * len(items)
+        rolls = {}  # roll_number -> item index
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[i] = item_error("BATCH003", "Item must be a JSON object")
+            elif field_error := text_field_error(item, STUDENT_TEXT_FIELDS):
+                results[i] = field_error
+            elif not item.get("roll_number"):
+                results[i] = item_error("STUDENT001", "Roll Number is required")
+            elif not item.get("first_name"):
+                results[i] = item_error("STUDENT002", "First Name is required")
+            elif item["roll_number"] in rolls:
+                results[i] = item_error("STUDENT003", "Roll Number already exists", 409)
+            else:
+                rolls[item["roll_number"]] = i
+
+        for (roll,) in select_in(Student.roll_number, rolls, Student.roll_number):
+            results[rolls.pop(roll)] = item_error("STUDENT003", "Roll Number already exists", 409)
+
+        if rolls:
+            try:
+                db.session.execute(insert(Student), [{
+                    "roll_number": roll,
+                    "first_name": items[i]["first_name"],
+                    "last_name": items[i].get("last_name")
+                } for roll, i in rolls.items()])
+                columns = [getattr(Student, name) for name in STUDENT_FIELDS]
+                for row in select_in(Student.roll_number, rolls, *columns):
+                    results[rolls[row.roll_number]] = item_created(STUDENT_FIELDS, row)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                return error_response("STUDENT003", "Roll Number already exists", 409)
+        return {"results": results}, 207
+
+# An integer ID from a JSON value (ints or digit strings), otherwise None
+def as_id(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+        return int(value)
+    return None
+
+class EnrollmentBatchAPI(Resource):
+    def post(self):
+        items, error = read_batch()
+        if error:
+            return error
+        results = [None] * len(items)
+        wanted = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[i] = item_error("BATCH003", "Item must be a JSON object")
+            else:
+                wanted.append((i, as_id(item.get("student_id")), as_id(item.get("course_id"))))
+
+        student_ids = {student_id for _, student_id, _ in wanted} - {None}
+        course_ids = {course_id for _, _, course_id in wanted} - {None}
+        students = {row[0] for row in select_in(Student.student_id, student_ids, Student.student_id)}
+        courses = {row[0] for row in select_in(Course.course_id, course_ids, Course.course_id)}
+        enrolled = set(select_in(Enrollment.student_id, students, Enrollment.student_id, Enrollment.course_id))
+
+        pairs = {}  # (student_id, course_id) -> item index
+        for i, student_id, course_id in wanted:
+            pair = (student_id, course_id)
+            if pair[0] not in students:
+                results[i] = item_error("ENROLLMENT002", "Student does not exist")
+            elif pair[1] not in courses:
+                results[i] = item_error("ENROLLMENT001", "Course does not exist")
+            elif pair in enrolled or pair in pairs:
+                results[i] = item_error("ENROLLMENT003", "Enrollment already exists")
+            else:
+                pairs[pair] = i
+
+        if pairs:
+            try:
+                db.session.execute(insert(Enrollment), [
+                    {"student_id": student_id, "course_id": course_id} for student_id, course_id in pairs
+                ])
+                columns = [getattr(Enrollment, name) for name in ENROLLMENT_FIELDS]
+                for row in select_in(Enrollment.student_id, {student_id for student_id, _ in pairs}, *columns):
+                    i = pairs.get((row.student_id, row.course_id))
+                    if i is not None:
+                        results[i] = item_created(ENROLLMENT_FIELDS, row)
+                adjust_enrollment_counts(Counter(course_id for _, course_id in pairs))
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                return error_response("ENROLLMENT003", "Enrollment already exists")
+        return {"results": results}, 207
+
 # Add Resources to API
 api.add_resource(CourseAPI, "/api/course", "/api/course/<int:course_id>")
 api.add_resource(StudentAPI, "/api/student", "/api/student/<int:student_id>")
 api.add_resource(EnrollmentAPI, "/api/student/<int:student_id>/course")
 api.add_resource(EnrollmentDeleteAPI, "/api/student/<int:student_id>/course/<int:course_id>")
+api.add_resource(CourseRosterAPI, "/api/course/<int:course_id>/students")
+api.add_resource(CourseStatsAPI, "/api/course/stats")
+api.add_resource(CourseBatchAPI, "/api/course/batch")
+api.add_resource(StudentBatchAPI, "/api/student/batch")
+api.add_resource(EnrollmentBatchAPI, "/api/enrollment/batch")
+api.add_resource(SearchAPI, "/api/search")
+api.add_resource(CacheStatsAPI, "/api/cache/stats")
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
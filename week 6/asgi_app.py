@@ -0,0 +1,244 @@
+from urllib.parse import urlencode
+from quart import Quart, request
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlite_profile import engine_options, install_pragmas, profile_pragmas
+from app import app as flask_app, db, Course, Student, Enrollment, as_dict, error_response, \
+    prefix_upper_bound, enrollment_count_params, COURSE_FIELDS, STUDENT_FIELDS, ENROLLMENT_FIELDS, \
+    DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, ENROLLMENT_COUNT_UPSERT
+
+# Async deployment of the course/student/enrollment API: same routes, JSON
+# bodies and error codes as app.py, but every handler awaits the database
+# through aiosqlite, so one process can hold thousands of idle connections.
+# Needs quart, hypercorn, aiosqlite and sqlalchemy[asyncio]. Run it under an
+# ASGI server, e.g.
+#   hypercorn asgi_app:app --bind 127.0.0.1:8000
+# It shares the models, DATABASE_URL and SQLITE_PROFILE with app.py. The
+# batch endpoints and the response cache stay in app.py. Both can serve one
+# database: the cache versions are bumped by triggers in the database, so
+# this process's writes invalidate app.py's cached responses too.
+
+app = Quart(__name__)
+
+# Same database file as the Flask app (relative sqlite paths resolve to its
+# instance folder), through the async driver
+with flask_app.app_context():
+    url = db.engine.url.set(drivername="sqlite+aiosqlite")
+engine = create_async_engine(url, **engine_options(flask_app.config["SQLITE_PROFILE"]))
+install_pragmas(engine.sync_engine, profile_pragmas(flask_app.config))
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+# async version of app.adjust_enrollment_counts
+async def adjust_enrollment_counts(session, deltas):
+    params = enrollment_count_params(deltas)
+    if params:
+        await session.execute(ENROLLMENT_COUNT_UPSERT, params)
+
+# async version of app.paginated_list
+async def paginated_list(session, model, key, fields, *criteria):
+    limit = max(1, min(request.args.get("limit", DEFAULT_PAGE_LIMIT, type=int), MAX_PAGE_LIMIT))
+    after = request.args.get("after", type=int)
+    selected = fields
+    if request.args.get("fields"):
+        selected = tuple(dict.fromkeys(name.strip() for name in request.args["fields"].split(",") if name.strip()))
+        unknown = [name for name in selected if name not in fields]
+        if unknown or not selected:
+            return error_response("QUERY001", f"Unknown fields: {', '.join(unknown)}")
+
+    key_column = getattr(model, key)
+    query = select(key_column, *[getattr(model, name) for name in selected]).where(*criteria)
+    if after is not None:
+        query = query.where(key_column > after)
+    rows = (await session.execute(query.order_by(key_column).limit(limit + 1))).all()
+
+    headers = {}
+    if len(rows) > limit:
+        cursor = rows[limit - 1][0]
+        params = request.args.to_dict()
+        params["after"] = cursor
+        headers["Link"] = f'<{request.base_url}?{urlencode(params)}>; rel="next"'
+        headers["X-Next-Cursor"] = str(cursor)
+    return [dict(zip(selected, row[1:])) for row in rows[:limit]], 200, headers
+
+# Course APIs
+@app.get("/api/course")
+async def list_courses():
+    criteria = []
+    code_prefix = request.args.get("course_code")
+    if code_prefix:
+        criteria += [Course.course_code >= code_prefix, Course.course_code < prefix_upper_bound(code_prefix)]
+    async with Session() as session:
+        return await paginated_list(session, Course, "course_id", COURSE_FIELDS, *criteria)
+
+@app.get("/api/course/<int:course_id>")
+async def get_course(course_id):
+    async with Session() as session:
+        course = await session.get(Course, course_id)
+        if not course:
+            return {"message": "Course not found"}, 404
+        return as_dict(course, COURSE_FIELDS), 200
+
+@app.post("/api/course")
+async def create_course():
+    data = await request.get_json()
+    # Validate required fields
+    if not data.get("course_name"):
+        return error_response("COURSE001", "Course Name is required")
+    if not data.get("course_code"):
+        return error_response("COURSE002", "Course Code is required")
+    async with Session() as session:
+        try:
+            new_course = Course(
+                course_name=data["course_name"],
+                course_code=data["course_code"],
+                course_description=data.get("course_description")
+            )
+            session.add(new_course)
+            await session.commit()
+            return as_dict(new_course, COURSE_FIELDS), 201
+        except IntegrityError:
+            await session.rollback()
+            return error_response("COURSE003", "Course Code already exists", 409)
+
+@app.put("/api/course/<int:course_id>")
+async def update_course(course_id):
+    async with Session() as session:
+        course = await session.get(Course, course_id)
+        if not course:
+            return {"message": "Course not found"}, 404
+        data = await request.get_json()
+        course.course_name = data.get("course_name", course.course_name)
+        course.course_code = data.get("course_code", course.course_code)
+        course.course_description = data.get("course_description", course.course_description)
+        await session.commit()
+        return as_dict(course, COURSE_FIELDS), 200
+
+@app.delete("/api/course/<int:course_id>")
+async def delete_course(course_id):
+    async with Session() as session:
+        course = await session.get(Course, course_id)
+        if not course:
+            return {"message": "Course not found"}, 404
+        await session.delete(course)
+        await session.commit()
+        return {"message": "Successfully Deleted"}, 200
+
+# Student APIs
+@app.get("/api/student")
+async def list_students():
+    criteria = []
+    if request.args.get("roll_number"):
+        criteria.append(Student.roll_number == request.args["roll_number"])
+    async with Session() as session:
+        return await paginated_list(session, Student, "student_id", STUDENT_FIELDS, *criteria)
+
+@app.get("/api/student/<int:student_id>")
+async def get_student(student_id):
+    async with Session() as session:
+        student = await session.get(Student, student_id)
+        if not student:
+            return {"message": "Student not found"}, 404
+        return as_dict(student, STUDENT_FIELDS), 200
+
+@app.post("/api/student")
+async def create_student():
+    data = await request.get_json()
+    # Validate required fields
+    if not data.get("roll_number"):
+        return error_response("STUDENT001", "Roll Number is required")
+    if not data.get("first_name"):
+        return error_response("STUDENT002", "First Name is required")
+    async with Session() as session:
+        try:
+            new_student = Student(
+                roll_number=data["roll_number"],
+                first_name=data["first_name"],
+                last_name=data.get("last_name")
+            )
+            session.add(new_student)
+            await session.commit()
+            return as_dict(new_student, STUDENT_FIELDS), 201
+        except IntegrityError:
+            await session.rollback()
+            return error_response("STUDENT003", "Roll Number already exists", 409)
+
+@app.put("/api/student/<int:student_id>")
+async def update_student(student_id):
+    async with Session() as session:
+        student = await session.get(Student, student_id)
+        if not student:
+            return {"message": "Student not found"}, 404
+        data = await request.get_json()
+        student.roll_number = data.get("roll_number", student.roll_number)
+        student.first_name = data.get("first_name", student.first_name)
+        student.last_name = data.get("last_name", student.last_name)
+        await session.commit()
+        return as_dict(student, STUDENT_FIELDS), 200
+
+@app.delete("/api/student/<int:student_id>")
+async def delete_student(student_id):
+    async with Session() as session:
+        student = await session.get(Student, student_id)
+        if not student:
+            return {"message": "Student not found"}, 404
+        course_ids = await session.scalars(select(Enrollment.course_id).where(Enrollment.student_id == student_id))
+        await adjust_enrollment_counts(session, {course_id: -1 for course_id in course_ids})
+        await session.delete(student)
+        await session.commit()
+        return {"message": "Successfully Deleted"}, 200
+
+# Enrollment APIs
+@app.get("/api/student/<int:student_id>/course")
+async def list_enrollments(student_id):
+    async with Session() as session:
+        if not await session.get(Student, student_id):
+            return error_response("ENROLLMENT002", "Student does not exist")
+        enrollments = (await session.scalars(select(Enrollment).filter_by(student_id=student_id))).all()
+        if not enrollments:
+            return {"message": "Student is not enrolled in any course"}, 404
+        return [as_dict(enrollment, ENROLLMENT_FIELDS) for enrollment in enrollments], 200
+
+@app.post("/api/student/<int:student_id>/course")
+async def create_enrollment(student_id):
+    async with Session() as session:
+        if not await session.get(Student, student_id):
+            return error_response("ENROLLMENT002", "Student does not exist")
+        data = await request.get_json()
+        course_id = data.get("course_id")
+        course = await session.get(Course, course_id) if course_id is not None else None
+        if not course:
+            return error_response("ENROLLMENT001", "Course does not exist")
+        try:
+            new_enrollment = Enrollment(student_id=student_id, course_id=course.course_id)
+            session.add(new_enrollment)
+            await session.flush()
+            await adjust_enrollment_counts(session, {course.course_id: 1})
+            await session.commit()
+            return as_dict(new_enrollment, ENROLLMENT_FIELDS), 201
+        except IntegrityError:
+            await session.rollback()
+            return error_response("ENROLLMENT003", "Enrollment already exists")
+
+@app.delete("/api/student/<int:student_id>/course/<int:course_id>")
+async def delete_enrollment(student_id, course_id):
+    async with Session() as session:
+        if not await session.get(Student, student_id):
+            return error_response("ENROLLMENT002", "Student does not exist")
+        if not await session.get(Course, course_id):
+            return error_response("ENROLLMENT001", "Course does not exist")
+        enrollment = (await session.scalars(
+            select(Enrollment).filter_by(student_id=student_id, course_id=course_id).limit(1))).first()
+        if not enrollment:
+            return {"message": "Enrollment for the student not found"}, 404
+        await session.delete(enrollment)
+        await adjust_enrollment_counts(session, {course_id: -1})
+        await session.commit()
+        return {"message": "Successfully Deleted"}, 200
+
+@app.after_serving
+async def dispose_engine():
+    await engine.dispose()
+
+if __name__ == '__main__':
+    app.run(debug=True)
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+# WSGI (app.py on werkzeug's threaded server, as app.run() serves it) vs ASGI
+# (asgi_app.py on hypercorn): hold many idle client connections open, then
+# measure a few busy clients' throughput, p50/p99 latency and failures, plus
+# the server's memory and thread count while all those connections are open.
+# An idle connection is connected but hasn't sent its request yet; werkzeug
+# closes every connection after one response, so that is the only way a
+# client can sit on it there (a thread each), and hypercorn treats it the
+# same as a keep-alive connection between requests (a parked coroutine).
+# Usage: python bench_asgi.py [idle connections] [busy clients] [requests per client]
+
+SEED_STUDENTS = 1000
+WRITE_RATIO = 0.2
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def server_commands(port):
+    return {
+        "wsgi": [sys.executable, __file__, "--wsgi", str(port)],
+        "asgi": [sys.executable, "-m", "hypercorn", "asgi_app:app", "--bind", f"127.0.0.1:{port}",
+                 "--keep-alive", "600", "--backlog", "4096"],
+    }
+
+# Runs in a fresh interpreter with DATABASE_URL already set
+def seed():
+    from app import app, db, Student
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Student(roll_number=f"S{i}", first_name="Seed") for i in range(SEED_STUDENTS)])
+        db.session.commit()
+
+def serve_wsgi(port):
+    from werkzeug.serving import make_server
+    from app import app
+    make_server("127.0.0.1", port, app, threaded=True).serve_forever()
+
+def server_usage(pid):
+    usage = {}
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            name, _, value = line.partition(":")
+            if name in ("VmRSS", "Threads"):
+                usage[name] = int(value.split()[0])
+    return usage
+
+async def fetch(reader, writer, method, path, body=None):
+    head = f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+    payload = b""
+    if body is not None:
+        payload = json.dumps(body).encode()
+        head += f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+    writer.write(head.encode() + b"\r\n" + payload)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length, keep_alive = 0, True
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+async def wait_for_server(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await fetch(reader, writer, "GET", "/api/course/1")
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+async def idle_connection(port, opened, failures):
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        opened.append(writer)
+    except OSError:
+        failures.append("idle")
+
+async def busy_client(port, requests, seed, latencies, failures):
+    rng = random.Random(seed)
+    writer = None
+    for i in range(requests):
+        if rng.random() < WRITE_RATIO:
+            args = ("POST", "/api/student", {"roll_number": f"B{seed}-{i}", "first_name": "Bench"})
+        else:
+            args = ("GET", f"/api/student/{rng.randint(1, SEED_STUDENTS)}")
+        start = time.perf_counter()
+        if writer is None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        status, keep_alive = await fetch(reader, writer, *args)
+        latencies.append(time.perf_counter() - start)
+        if status >= 500:
+            failures.append(status)
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer:
+        writer.close()
+
+async def run_load(pid, port, idle, clients, requests):
+    await wait_for_server(port)
+    opened, idle_failures = [], []
+    for i in range(0, idle, 200):  # don't overflow the listen backlog
+        await asyncio.gather(*[idle_connection(port, opened, idle_failures) for _ in range(min(200, idle - i))])
+        await asyncio.sleep(0.05)
+
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[busy_client(port, requests, n, latencies, failures) for n in range(clients)])
+    elapsed = time.perf_counter() - start
+    usage = server_usage(pid)
+    for writer in opened:
+        writer.close()
+    return {
+        "idle": len(opened),
+        "req/s": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "failed": len(failures) + len(idle_failures),
+        "rss": usage["VmRSS"] / 1024,
+        "threads": usage["Threads"],
+    }
+
+def main():
+    if len(sys.argv) == 2 and sys.argv[1] == "--seed":
+        seed()
+        return
+    if len(sys.argv) == 3 and sys.argv[1] == "--wsgi":
+        serve_wsgi(int(sys.argv[2]))
+        return
+
+    idle = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    requests = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    # Every connection is a file descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    print(f"{idle} idle connections, {clients} busy clients x {requests} requests, {WRITE_RATIO:.0%} writes")
+    print(f"{'server':<8}{'idle':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}{'RSS MiB':>10}{'threads':>9}")
+    for name in ("wsgi", "asgi"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.sqlite3')}")
+            subprocess.run([sys.executable, __file__, "--seed"], env=env, cwd=HERE, check=True)
+            port = free_port()
+            server = subprocess.Popen(server_commands(port)[name], env=env, cwd=HERE,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                result = asyncio.run(run_load(server.pid, port, idle, clients, requests))
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"{name:<8}{result['idle']:>8}{result['req/s']:>10.0f}{result['p50']:>10.2f}{result['p99']:>10.2f}"
+                  f"{result['failed']:>8}{result['rss']:>10.1f}{result['threads']:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Mixed read/write HTTP load against the API on a threaded server, once per
+# SQLite profile, reporting throughput, p50/p99 latency and failed requests.
+# Usage: python bench_concurrency.py [clients] [requests per client] [write ratio]
+
+PROFILES = ["default", "production"]
+SEED_STUDENTS = 1000
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+def client(port, requests, write_ratio, seed, latencies, failures):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for i in range(requests):
+        if rng.random() < write_ratio:
+            body = json.dumps({"roll_number": f"B{seed}-{i}", "first_name": "Bench"})
+            args = ("POST", "/api/student", body, {"Content-Type": "application/json"})
+        else:
+            args = ("GET", f"/api/student/{rng.randint(1, SEED_STUDENTS)}")
+        start = time.perf_counter()
+        conn.request(*args)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status >= 500:
+            failures.append(response.status)
+    conn.close()
+
+# Runs in a fresh interpreter with SQLITE_PROFILE/DATABASE_URL already set
+def run_profile(clients, requests, write_ratio):
+    from werkzeug.serving import make_server
+    from app import app, db, Student
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Student(roll_number=f"S{i}", first_name="Seed") for i in range(SEED_STUDENTS)])
+        db.session.commit()
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    latencies, failures = [], []
+    threads = [threading.Thread(target=client, args=(server.port, requests, write_ratio, n, latencies, failures))
+               for n in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"{len(latencies) / elapsed:.0f},{percentile(latencies, 50) * 1000:.2f},"
+          f"{percentile(latencies, 99) * 1000:.2f},{len(failures)}")
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--run":
+        run_profile(int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]))
+        return
+
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    write_ratio = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+    print(f"{clients} clients x {requests} requests, {write_ratio:.0%} writes")
+    print(f"{'profile':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'5xx':>8}")
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, SQLITE_PROFILE=profile,
+                       DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.sqlite3')}")
+            out = subprocess.run([sys.executable, __file__, "--run", str(clients), str(requests), str(write_ratio)],
+                                 env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                 capture_output=True, text=True, check=True).stdout
+            throughput, p50, p99, failures = out.strip().splitlines()[-1].split(",")
+            print(f"{profile:<12}{throughput:>10}{p50:>10}{p99:>10}{failures:>8}")
+
+if __name__ == "__main__":
+    main()
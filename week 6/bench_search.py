@@ -0,0 +1,82 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# /api/search latency over a large student table, through the Flask test
+# client. Names are drawn with a skew (a few very common ones) so some
+# queries match many thousands of rows, whole surnames included.
+# Usage: python bench_search.py [students] [queries]   (default 1,000,000 and 2,000)
+
+DEFAULT_STUDENTS = 1_000_000
+DEFAULT_QUERIES = 2000
+SYLLABLES = ["an", "ja", "mi", "ra", "ko", "li", "sa", "de", "vi", "to", "ne", "ha", "ru", "el", "po", "ki"]
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+def make_names(rng, count, syllables):
+    names = set()
+    while len(names) < count:
+        names.add("".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize())
+    return sorted(names)
+
+# Log-uniform rank: the commonest name is ~8% of students, like a real surname list
+def skewed(rng, names):
+    return names[int(len(names) ** rng.random()) - 1]
+
+def build(path, students, rng):
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from app import app, db
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()
+    first_names, last_names = make_names(rng, 800, 3), make_names(rng, 5000, 4)
+    rng.shuffle(first_names)
+    rng.shuffle(last_names)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO student (roll_number, first_name, last_name) VALUES (?, ?, ?)",
+                     ((f"R{i:08d}", skewed(rng, first_names), skewed(rng, last_names)) for i in range(students)))
+    conn.executemany("INSERT INTO course (course_code, course_name) VALUES (?, ?)",
+                     ((f"CS{i}", f"Course {i}") for i in range(100, 600)))
+    conn.commit()
+    conn.close()
+    return first_names, last_names
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_STUDENTS
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_QUERIES
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Indexing {students:,} students...")
+        start = time.perf_counter()
+        first_names, last_names = build(os.path.join(tmp, "search.sqlite3"), students, rng)
+        print(f"  {time.perf_counter() - start:.1f} s")
+
+        from app import app
+        client = app.test_client()
+        kinds = {
+            "name prefix": lambda: rng.choice(last_names)[:rng.randint(3, 6)],
+            "first + last": lambda: f"{rng.choice(first_names)} {rng.choice(last_names)[:3]}",
+            "whole surname": lambda: skewed(rng, last_names),
+            "roll number": lambda: f"R{rng.randrange(students):08d}",
+            "course code": lambda: f"cs{rng.randint(1, 5)}",
+        }
+        print(f"{'query':<16}{'p50 ms':>10}{'p99 ms':>10}{'avg hits':>10}")
+        for name, make_query in kinds.items():
+            latencies, hits = [], 0
+            for i in range(queries // len(kinds)):
+                # the unique _ parameter keeps the response cache out of the measurement
+                url = f"/api/search?q={make_query()}&limit=20&_={name}{i}"
+                start = time.perf_counter()
+                response = client.get(url)
+                latencies.append(time.perf_counter() - start)
+                hits += len(response.get_json())
+            print(f"{name:<16}{percentile(latencies, 50) * 1000:>10.2f}{percentile(latencies, 99) * 1000:>10.2f}"
+                  f"{hits / (queries // len(kinds)):>10.1f}")
+
+if __name__ == "__main__":
+    main()
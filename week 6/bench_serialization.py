@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Serializing every student: ORM objects + hand-built dicts + stdlib json (the
+# old resource code) vs column rows + stdlib json vs column rows + the app's
+# encoder (orjson when installed), and the NDJSON stream end to end.
+# Usage: python bench_serialization.py [students]   (default 100,000)
+
+DEFAULT_STUDENTS = 100_000
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_STUDENTS
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.sqlite3')}"
+        from sqlalchemy import insert
+        from app import app, db, dumps, orjson, Student, STUDENT_FIELDS
+
+        with app.app_context():
+            db.create_all()
+            db.session.execute(insert(Student), [
+                {"roll_number": f"S{i:07d}", "first_name": f"First{i}", "last_name": f"Last{i}"}
+                for i in range(students)
+            ])
+            db.session.commit()
+            columns = [getattr(Student, name) for name in STUDENT_FIELDS]
+
+            def orm_objects():
+                db.session.expunge_all()
+                return json.dumps([{
+                    "student_id": student.student_id,
+                    "roll_number": student.roll_number,
+                    "first_name": student.first_name,
+                    "last_name": student.last_name
+                } for student in Student.query.all()]).encode()
+
+            def column_rows():
+                rows = db.session.execute(db.select(*columns)).all()
+                return json.dumps([dict(zip(STUDENT_FIELDS, row)) for row in rows]).encode()
+
+            def column_rows_app_encoder():
+                rows = db.session.execute(db.select(*columns)).all()
+                return dumps([dict(zip(STUDENT_FIELDS, row)) for row in rows])
+
+            cases = [
+                ("ORM objects + json", orm_objects),
+                ("column rows + json", column_rows),
+                (f"column rows + {'orjson' if orjson else 'json'}", column_rows_app_encoder),
+            ]
+            results = [(name, *timed(func)) for name, func in cases]
+
+        client = app.test_client()
+        seconds, body = timed(lambda: client.get("/api/student?format=ndjson").data)
+        assert body.count(b"\n") == students
+        results.append(("NDJSON endpoint", seconds, body))
+
+    baseline = results[0][1]
+    print(f"{students:,} students")
+    print(f"{'path':<28}{'seconds':>10}{'MiB':>8}{'speedup':>10}")
+    for name, seconds, body in results:
+        print(f"{name:<28}{seconds:>10.3f}{len(body) / 2 ** 20:>8.1f}{baseline / seconds:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# SQL objects that go with the models' tables but can't be declared on them:
+# the full-text search index, the table version counters and their triggers.
+# Plain strings with no imports, so app.py (through an after_create listener),
+# setup_db.py and migrate_db.py all use this one definition.
+
+# Full-text search index over student and course names and codes. The rowid
+# is 2 * student_id for students and 2 * course_id + 1 for courses; triggers
+# keep it in step with the tables.
+SEARCH_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        first_name, last_name, roll_number, course_code, course_name,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS student_search_insert AFTER INSERT ON student BEGIN
+        INSERT INTO search_index (rowid, first_name, last_name, roll_number)
+        VALUES (2 * new.student_id, new.first_name, new.last_name, new.roll_number);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS student_search_update AFTER UPDATE ON student BEGIN
+        DELETE FROM search_index WHERE rowid = 2 * old.student_id;
+        INSERT INTO search_index (rowid, first_name, last_name, roll_number)
+        VALUES (2 * new.student_id, new.first_name, new.last_name, new.roll_number);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS student_search_delete AFTER DELETE ON student BEGIN
+        DELETE FROM search_index WHERE rowid = 2 * old.student_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS course_search_insert AFTER INSERT ON course BEGIN
+        INSERT INTO search_index (rowid, course_code, course_name)
+        VALUES (2 * new.course_id + 1, new.course_code, new.course_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS course_search_update AFTER UPDATE ON course BEGIN
+        DELETE FROM search_index WHERE rowid = 2 * old.course_id + 1;
+        INSERT INTO search_index (rowid, course_code, course_name)
+        VALUES (2 * new.course_id + 1, new.course_code, new.course_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS course_search_delete AFTER DELETE ON course BEGIN
+        DELETE FROM search_index WHERE rowid = 2 * old.course_id + 1;
+    END""",
+]
+# Fills a newly created search index from the existing rows
+SEARCH_BACKFILL = [
+    """INSERT INTO search_index (rowid, first_name, last_name, roll_number)
+    SELECT 2 * student_id, first_name, last_name, roll_number FROM student""",
+    """INSERT INTO search_index (rowid, course_code, course_name)
+    SELECT 2 * course_id + 1, course_code, course_name FROM course""",
+]
+
+# Per-table write counters for the response cache in app.py. Triggers bump
+# them in the writing transaction, so writes from any process or script are
+# seen. They start at a random value so a recreated database doesn't repeat
+# the ETags of the old one.
+VERSIONED_TABLES = ["course", "student", "enrollment"]
+TABLE_VERSION_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS table_version (
+        name TEXT NOT NULL PRIMARY KEY,
+        version INTEGER NOT NULL
+    )""",
+    "INSERT OR IGNORE INTO table_version (name, version) VALUES "
+    + ", ".join(f"('{table}', random() & 1073741823)" for table in VERSIONED_TABLES),
+] + [
+    f"""CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table} BEGIN
+        UPDATE table_version SET version = version + 1 WHERE name = '{table}';
+    END"""
+    for table in VERSIONED_TABLES for event in ("INSERT", "UPDATE", "DELETE")
+]
@@ -0,0 +1,50 @@
+from sqlalchemy import event
+
+# Engine profiles for the SQLite file database, picked with app.config['SQLITE_PROFILE']
+# (the apps read it from the SQLITE_PROFILE environment variable).
+#   default:    SQLite's own settings (rollback journal, FULL sync)
+#   production: WAL so readers don't block the writer, NORMAL sync, a busy timeout
+#               instead of immediate "database is locked", mmap'd reads, a
+#               bigger page cache and a larger pool for threaded workers
+PROFILES = {
+    "default": {
+        "engine_options": {},
+        "pragmas": {},
+    },
+    "production": {
+        "engine_options": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30},
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,  # ms
+            "mmap_size": 268435456,  # 256 MiB
+            "cache_size": -65536,  # negative means KiB: 64 MiB
+            "temp_store": "MEMORY",
+        },
+    },
+}
+
+# Run on every connection whatever the profile: SQLite only enforces foreign
+# keys (and their ON DELETE CASCADE) when asked to, per connection
+REQUIRED_PRAGMAS = {"foreign_keys": "ON"}
+
+# For app.config['SQLALCHEMY_ENGINE_OPTIONS'], set before SQLAlchemy(app)
+def engine_options(profile):
+    return dict(PROFILES[profile]["engine_options"])
+
+# Run PRAGMAs on every new connection of a (sync) engine
+def install_pragmas(engine, pragmas):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+# The profile's PRAGMAs plus any app.config['SQLITE_PRAGMAS'] overrides
+def profile_pragmas(config):
+    return {**REQUIRED_PRAGMAS, **PROFILES[config["SQLITE_PROFILE"]]["pragmas"], **config.get("SQLITE_PRAGMAS", {})}
+
+def apply_pragmas(app, db):
+    with app.app_context():
+        install_pragmas(db.engine, profile_pragmas(app.config))